@@ -14,25 +14,17 @@ from __future__ import annotations
 
 import json
 import os
-import re
-import shlex
+import stat
+import string
 import subprocess
 import sys
 import time
-import uvicorn
-import boto3
-from botocore.exceptions import NoCredentialsError, ProfileNotFound
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
-from textwrap import dedent
-from typing import Optional, Dict, Any, List, Union
-import yaml
-from pydantic import BaseModel, Field, validator
+from typing import Optional, Dict, List
 
 import typer
-from agentcli.server import create_app
-
-# Store the original directory - will be set when needed
-_original_dir = None
 
 # Create the main Typer app
 APP = typer.Typer(
@@ -41,8 +33,22 @@ APP = typer.Typer(
     add_completion=False
 )
 
-# Global variable to store the project directory
-_project_dir = None
+# Host AWS variables forwarded into the container when not set by the .env file
+_HOST_AWS_VARS = ('AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY', 'AWS_SESSION_TOKEN', 'AWS_REGION')
+
+# Project files bind-mounted into the agent container by container_run
+_DOCKER_RUN_MOUNTS = (
+    "-v", "{project_dir}/src:/app/src",
+    "-v", "{project_dir}/requirements.txt:/app/requirements.txt",
+    "-v", "{project_dir}/.agent.yaml:/app/.agent.yaml",
+    "-v", "{project_dir}/container_entrypoint.py:/app/container_entrypoint.py",
+)
+
+# Seconds to wait between container health checks (first check runs at t=0)
+_HEALTH_CHECK_DELAYS = (0.1, 0.2, 0.4, 0.8, 1.5, 3.0, 5.0, 5.0, 5.0, 5.0)
+
+# pip prefix for requirement installs: skip the self-update probe and prompts
+_PIP_INSTALL = [sys.executable, "-m", "pip", "--disable-pip-version-check", "--no-input", "install", "-q"]
 
 def install_dependencies(project_dir: Path) -> None:
     """Install dependencies from requirements.txt if it exists."""
@@ -51,7 +57,7 @@ def install_dependencies(project_dir: Path) -> None:
         typer.echo("Installing dependencies from requirements.txt...")
         try:
             # nosec B603 – safe fixed command list
-            _run([sys.executable, "-m", "pip", "install", "-r", str(requirements_file)])
+            _run(_PIP_INSTALL + ["-r", str(requirements_file)])
             typer.echo("Dependencies installed successfully!")
         except subprocess.CalledProcessError as e:
             typer.echo(f"Warning: Failed to install dependencies: {e}", err=True)
@@ -62,15 +68,16 @@ def get_project_dir(ctx: typer.Context, param: typer.CallbackParam, value: str)
     """Validate and return the project directory."""
     if ctx.resilient_parsing or not value or value == ".":
         return value
+    # A single stat answers both "exists" and "is a directory"
     try:
-        path = Path(value).resolve()
-        if not path.exists():
-            raise typer.BadParameter(f"Directory does not exist: {path}")
-        if not path.is_dir():
-            raise typer.BadParameter(f"Not a directory: {path}")
-        return str(path)
-    except Exception as e:
+        st = os.stat(value)
+    except FileNotFoundError:
+        raise typer.BadParameter(f"Directory does not exist: {os.path.abspath(value)}")
+    except OSError as e:
         raise typer.BadParameter(str(e))
+    if not stat.S_ISDIR(st.st_mode):
+        raise typer.BadParameter(f"Not a directory: {os.path.abspath(value)}")
+    return os.path.abspath(value)
 
 @APP.callback()
 def main(
@@ -89,11 +96,32 @@ def main(
         return
         
     if ctx.invoked_subcommand is not None:
-        global _project_dir
-        path = Path(project_dir).resolve()
-        os.chdir(path)
-        sys.path.insert(0, str(path))
-        _project_dir = path
+        # get_project_dir already returned an absolute path; only "." needs expanding
+        ctx.obj = {"project_dir": Path(os.path.abspath(project_dir))}
+
+
+def _require_project_dir(ctx: typer.Context) -> Path:
+    """Return the project directory resolved by the root callback."""
+    project_dir = (ctx.obj or {}).get("project_dir")
+    if not project_dir:
+        typer.echo("Error: Project directory not set. Use --project-dir or run from agent directory.", err=True)
+        raise typer.Exit(1)
+    return project_dir
+
+
+@contextmanager
+def _working_directory(path: Path):
+    """Temporarily switch the process working directory to ``path``."""
+    previous = os.getcwd()
+    if previous == str(path):
+        # Already there (the usual `adt dev` from the project root): nothing to restore
+        yield
+        return
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
 
 
 
@@ -103,16 +131,28 @@ def main(
 
 CONFIG_PATH = Path.home() / ".agentcli" / "config.json"
 
+# (mtime_ns, size, inode) of CONFIG_PATH → parsed config
+_CFG_CACHE: Optional[tuple] = None
+
 
 def _load_cfg() -> dict:
-    if CONFIG_PATH.exists():
-        return json.loads(CONFIG_PATH.read_text())
-    return {}
+    global _CFG_CACHE
+    try:
+        st = CONFIG_PATH.stat()
+    except FileNotFoundError:
+        return {}
+    sig = (st.st_mtime_ns, st.st_size, st.st_ino)
+    if _CFG_CACHE is None or _CFG_CACHE[0] != sig:
+        _CFG_CACHE = (sig, json.loads(CONFIG_PATH.read_text()))
+    # Hand out a copy so callers can mutate before _save_cfg without touching the cache
+    return dict(_CFG_CACHE[1])
 
 
 def _save_cfg(cfg: dict) -> None:
+    global _CFG_CACHE
     CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
     CONFIG_PATH.write_text(json.dumps(cfg, indent=2))
+    _CFG_CACHE = None
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -120,17 +160,36 @@ def _save_cfg(cfg: dict) -> None:
 # ──────────────────────────────────────────────────────────────────────────────
 
 
+# .agent.yaml path → ((mtime_ns, size, inode), parsed config)
+_AGENT_YAML_CACHE: Dict[Path, tuple] = {}
+
+
+def _read_agent_yaml(config_file: Path) -> dict:
+    """Parse .agent.yaml, reusing the previous result while the file is unchanged."""
+    st = config_file.stat()
+    sig = (st.st_mtime_ns, st.st_size, st.st_ino)
+    hit = _AGENT_YAML_CACHE.get(config_file)
+    if hit and hit[0] == sig:
+        return hit[1]
+
+    import yaml
+    # Prefer the libyaml-backed loader when PyYAML was built with it
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(config_file, "rb") as f:
+        config = yaml.load(f, Loader=loader) or {}  # nosec B506 – safe loader only
+    _AGENT_YAML_CACHE[config_file] = (sig, config)
+    return config
+
+
 def _get_provider_class(project_dir: Path) -> str:
     """Get the provider class from .agent.yaml."""
     try:
         config_file = project_dir / ".agent.yaml"
         if not config_file.exists():
             return "Unknown Provider"
-        
-        import yaml
-        with open(config_file) as f:
-            config = yaml.safe_load(f)
-        
+
+        config = _read_agent_yaml(config_file)
+
         provider_class = config.get("provider", {}).get("class", "")
         return provider_class if provider_class else "Unknown Provider"
     except Exception:
@@ -142,8 +201,6 @@ def _run(cmd: list[str], cwd: Optional[Path] = None) -> None:
     Security rationale:
         • The command is provided as a *list* (not a shell string), meaning
           `shell=False` (default) and therefore no shell-injection vector.
-        • Each argument is quoted with :pyfunc:`shlex.quote` for display only
-          (does *not* affect execution) so users can copy/paste safely.
         • Bandit false-positives B603/B607 are suppressed with ``# nosec``.
         • All command elements are validated as strings to prevent injection.
     """
@@ -152,27 +209,21 @@ def _run(cmd: list[str], cwd: Optional[Path] = None) -> None:
         raise ValueError("Command must be a non-empty list")
     
     # Validate each command element is a string (prevents injection)
-    validated_cmd = []
-    for arg in cmd:
-        if not isinstance(arg, (str, Path)):
-            raise ValueError(f"Command argument must be string or Path, got {type(arg)}: {arg}")
-        validated_cmd.append(str(arg))
-    
-    # Remove verbose command display
-    pass
+    if not all(isinstance(arg, (str, Path)) for arg in cmd):
+        bad = next(arg for arg in cmd if not isinstance(arg, (str, Path)))
+        raise ValueError(f"Command argument must be string or Path, got {type(bad)}: {bad}")
 
     # nosec B603,B607 – safe: shell=False and validated string list
     # nosemgrep: dangerous-subprocess-use-audit
-    res = subprocess.run(
-        validated_cmd,  # nosec B603 – validated command list, shell=False, no injection risk
-        cwd=cwd, 
-        text=True, 
+    # Output is streamed to the parent's stdout/stderr, so only the exit code is needed
+    returncode = subprocess.call(
+        [str(arg) for arg in cmd],  # nosec B603 – validated command list, shell=False, no injection risk
+        cwd=cwd,
         shell=False,  # Explicitly disable shell to prevent injection
-        check=False   # Handle return codes manually
     )
-    if res.returncode != 0:
+    if returncode != 0:
         typer.secho("Command failed", fg=typer.colors.RED)
-        raise typer.Exit(res.returncode)
+        raise typer.Exit(returncode)
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -187,8 +238,8 @@ Examples:
 """
 
 
-@APP.command("init", help=_INIT_HELP)
 def init(
+    ctx: typer.Context,
     name: str = typer.Argument(..., help="Project directory name"),
     pkg: Optional[str] = typer.Option(
         None,
@@ -202,11 +253,13 @@ def init(
     from ..generators import create_project_generator
     
     generator = create_project_generator()
-    generator.generate_project(name, pkg)
+    # The new project is created relative to --project-dir
+    with _working_directory(_require_project_dir(ctx)):
+        generator.generate_project(name, pkg)
 
 
-@APP.command("dev", help="Run the agent in a development server")
 def dev(
+    ctx: typer.Context,
     port: int = typer.Option(8000, "--port", "-p", help="Port to run the server on"),
     agent_path: str = typer.Option("src/agent.py", "--agent", "-a", help="Path to the agent.py file"),
     env_file: str = typer.Option("", "--env-file", help="Path to .env file for environment variables"),
@@ -219,39 +272,38 @@ def dev(
     
     The server provides a REST API for interacting with the agent.
     """
+    project_dir = _require_project_dir(ctx)
     if container:
         # Run in container mode
-        return _dev_container(port, env_file, rebuild, aws_profile)
+        return _dev_container(ctx, port, env_file, rebuild, aws_profile)
     else:
-        # Run locally (existing behavior)
-        return _dev_local(port, agent_path, env_file, rebuild, aws_profile, ui_dev)
+        # The agent's own code may rely on relative paths, so serve it from the project root
+        with _working_directory(project_dir):
+            return _dev_local(project_dir, port, agent_path, env_file, rebuild, aws_profile, ui_dev)
 
-def _dev_local(port, agent_path, env_file, rebuild, aws_profile, ui_dev):
+def _dev_local(project_dir, port, agent_path, env_file, rebuild, aws_profile, ui_dev):
     """Run agent development server locally."""
     from ..environment import create_environment_manager
     
-    if not _project_dir:
-        typer.echo("Error: Project directory not set. Use --project-dir or run from agent directory.", err=True)
-        raise typer.Exit(1)
-        
     try:
         # Setup environment - now passes project_dir for provider validation
         env_manager = create_environment_manager()
-        env_file_path = Path(env_file).resolve() if env_file else None
-        env_manager.setup_environment(env_file_path, aws_profile or None, _project_dir)
+        env_file_path = (project_dir / env_file).resolve() if env_file else None
+        env_manager.setup_environment(env_file_path, aws_profile or None, project_dir)
         
         # Get absolute path to agent.py
-        agent_file = (_project_dir / agent_path).resolve()
+        agent_file = (project_dir / agent_path).resolve()
         if not agent_file.exists():
             typer.echo(f"❌ Agent file not found: {agent_file}", err=True)
             raise typer.Exit(1)
             
         # Install or reinstall dependencies if needed
-        requirements = Path("requirements.txt")
-        if rebuild and requirements.exists():
+        requirements = project_dir / "requirements.txt"
+        requirements_exist = requirements.is_file()
+        if rebuild and requirements_exist:
             # nosec B603 – safe fixed command list
-            _run([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
-        elif not requirements.exists():
+            _run(_PIP_INSTALL + ["-r", str(requirements)])
+        elif not requirements_exist:
             typer.echo("⚠️  Warning: No requirements.txt found", err=True)
         
         # AUTO-BUILD UI: Check and build UI assets if needed
@@ -275,10 +327,15 @@ def _dev_local(port, agent_path, env_file, rebuild, aws_profile, ui_dev):
         
         # Show clean status messages
         typer.echo("✅ Agent loaded")
-        provider_class = _get_provider_class(_project_dir)
+        provider_class = _get_provider_class(project_dir)
         typer.echo(f"🤖 Agent uses {provider_class} as Model Provider")
 
         # Create the FastAPI app with our agent
+        from ..server import create_app
+
+        if str(project_dir) not in sys.path:
+            sys.path.insert(0, str(project_dir))
+
         attempted_install = False
         while True:
             try:
@@ -290,15 +347,14 @@ def _dev_local(port, agent_path, env_file, rebuild, aws_profile, ui_dev):
                     raise
                 attempted_install = True
 
-                requirements = Path("requirements.txt")
-                if not requirements.exists():
+                if not requirements_exist:
                     typer.echo(f"❌ Missing dependency '{e.name}' and no requirements.txt found.", err=True)
                     raise
 
                 typer.echo(f"📦 Missing dependency '{e.name}'. Installing project deps …")
                 try:
                     # nosec B603 – safe fixed command list
-                    _run([sys.executable, "-m", "pip", "install", "-r", str(requirements)])
+                    _run(_PIP_INSTALL + ["-r", str(requirements)])
                 except subprocess.CalledProcessError as err:
                     typer.echo(f"❌ Failed to install requirements: {err}", err=True)
                     raise
@@ -307,17 +363,16 @@ def _dev_local(port, agent_path, env_file, rebuild, aws_profile, ui_dev):
         typer.echo(f"🚀 Chat UI available at http://localhost:{port}")
         if ui_dev:
             typer.echo("🔄 Hot reload enabled for UI development")
+        import uvicorn
         uvicorn.run(app, host="0.0.0.0", port=port)
         
     except Exception as e:
         typer.echo(f"❌ Error running development server: {e}", err=True)
         raise typer.Exit(1)
 
-def _dev_container(port, env_file, rebuild, aws_profile):
+def _dev_container(ctx: typer.Context, port, env_file, rebuild, aws_profile):
     """Run agent development server in Docker container with local UI."""
-    if not _project_dir:
-        typer.echo("Error: Project directory not set. Use --project-dir or run from agent directory.", err=True)
-        raise typer.Exit(1)
+    project_dir = _require_project_dir(ctx)
 
     try:
         # Stop any existing containers first
@@ -329,14 +384,15 @@ def _dev_container(port, env_file, rebuild, aws_profile):
             cmd = ["docker", "build", "-t", "agent:latest"]
             if rebuild:
                 cmd.append("--no-cache")
-            cmd.extend(["-f", str(_project_dir / "Dockerfile"), str(_project_dir)])
+            cmd.extend(["-f", str(project_dir / "Dockerfile"), str(project_dir)])
             
             typer.echo("🏗️ Building Docker image agent:latest…")
             _run(cmd)
+            _container_exists.cache_clear()
             typer.echo("✅ Successfully built agent:latest")
             
         # Prepare env_file path if provided
-        env_file_path = Path(env_file).resolve() if env_file else None
+        env_file_path = (project_dir / env_file).resolve() if env_file else None
         
         # Start the containerized backend on internal port
         container_internal_port = 8000  # Internal container port
@@ -347,6 +403,7 @@ def _dev_container(port, env_file, rebuild, aws_profile):
         
         # Start container in detached mode
         container_run(
+            ctx,
             port=container_internal_port, 
             env_file=env_file_path, 
             detach=True,  # Run in background
@@ -355,24 +412,17 @@ def _dev_container(port, env_file, rebuild, aws_profile):
         )
         
         # Wait for container to start with retries
-        import time
         typer.echo("⏳ Waiting for container to start...")
         
-        # Retry health check multiple times with exponential backoff
-        max_retries = 10
-        retry_interval = 1  # Start with 1 second, increase gradually
-        max_retry_interval = 5  # Cap at 5 seconds
-        
-        for attempt in range(max_retries):
-            typer.echo(f"🔍 Health check attempt {attempt + 1}/{max_retries}")
+        # Check immediately, then poll fast while the server is likely booting
+        # and back off once it is clearly taking a while
+        max_attempts = len(_HEALTH_CHECK_DELAYS) + 1
+        for attempt, delay in enumerate((0.0,) + _HEALTH_CHECK_DELAYS):
+            if delay:
+                time.sleep(delay)  # nosec B311 – intentional health check delay
+            typer.echo(f"🔍 Health check attempt {attempt + 1}/{max_attempts}")
             if _container_is_healthy(container_internal_port):
                 break
-            
-            # Exponential backoff with jitter for better reliability
-            if attempt < max_retries - 1:  # Don't sleep after last attempt
-                current_interval = min(retry_interval * (1.5 ** attempt), max_retry_interval)
-                typer.echo(f"⏱️  Waiting {current_interval:.1f}s before next check...")
-                time.sleep(current_interval)  # nosec B311 – intentional health check delay with exponential backoff
         else:
             typer.echo("❌ Container failed to start properly after multiple attempts", err=True)
             typer.echo("💡 Check container logs with: docker logs $(docker ps -q --filter ancestor=agent:latest)")
@@ -412,39 +462,31 @@ def _dev_container(port, env_file, rebuild, aws_profile):
         container_stop()
         raise typer.Exit(1)
 
+@lru_cache(maxsize=32)
 def _container_exists(tag: str) -> bool:
-    """Check if a Docker container image exists."""
-    try:
-        result = subprocess.run(  # nosec B603 – shell=False, fixed arg list; tag is arg element not shell string
-            ["docker", "images", "-q", tag],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return bool(result.stdout.strip())
-    except subprocess.CalledProcessError:
-        return False
+    """Check if a Docker container image exists.
+
+    Memoized per process; call ``_container_exists.cache_clear()`` after building.
+    """
+    result = subprocess.run(  # nosec B603 – shell=False, fixed arg list; tag is arg element not shell string
+        ["docker", "image", "inspect", tag],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    return result.returncode == 0
 
 def _container_is_healthy(port: int) -> bool:
     """Check if the container is healthy and responding."""
+    import http.client
+
+    conn = http.client.HTTPConnection("localhost", port, timeout=5)
     try:
-        import requests
-        response = requests.get(f"http://localhost:{port}/health", timeout=5)
-        return response.status_code == 200
-    except ImportError:
-        # Fallback to curl if requests not available
-        try:
-            result = subprocess.run(  # nosec B603 – shell=False, safe arg list
-                ["curl", "-s", "-o", "/dev/null", "-w", "%{http_code}", f"http://localhost:{port}/health"],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            return result.stdout.strip() == "200"
-        except:
-            return False
-    except:
+        conn.request("GET", "/health")
+        return conn.getresponse().status == 200
+    except (OSError, http.client.HTTPException):
         return False
+    finally:
+        conn.close()
 
 def _start_ui_with_container_backend(ui_port: int, backend_port: int):
     """Start local UI server that connects to containerized backend."""
@@ -460,11 +502,11 @@ def _start_ui_with_container_backend(ui_port: int, backend_port: int):
     )
     
     # Run the UI server
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=ui_port)
 
 
 
-@APP.command("cluster-bootstrap", help="Provision the shared ECS cluster (one-time) – stub", hidden=True)
 def cluster_bootstrap(stack_name: str = "AgentClusterStack"):
     cfg = _load_cfg()
     cfg["cluster_arn"] = "arn:aws:ecs:region:acct:cluster/shared"  # stub
@@ -473,59 +515,54 @@ def cluster_bootstrap(stack_name: str = "AgentClusterStack"):
     typer.secho("Saved fake ARNs – replace with real deploy logic", fg=typer.colors.YELLOW)
 
 
-@APP.command("deploy", help="Build, push & deploy (stub)", hidden=True)
 def deploy(stage: str = typer.Option("dev", "--stage")):
     typer.echo("TODO: docker build/push + CDK deploy")
 
 
-@APP.command("list", help="List agents (stub)", hidden=True)
 def list_():
     typer.echo("TODO: boto3 list_services")
 
 
-@APP.command("logs", help="Tail logs (stub)", hidden=True)
 def logs(name: str, lines: int = typer.Option(50, "--lines", "-n")):
     typer.echo("TODO: aws logs tail")
 
 
-@APP.command("destroy", help="Remove agent (stub)", hidden=True)
 def destroy(name: str, force: bool = typer.Option(False, "--yes", "-y")):
     typer.echo("TODO: CDK destroy / boto3 delete_service")
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Container management
 # ──────────────────────────────────────────────────────────────────────────────
-@APP.command("container-build", hidden=True)
 def container_build(
+    ctx: typer.Context,
     tag: str = typer.Option("agent:latest", "--tag", "-t", help="Docker image tag"),
     no_cache: bool = typer.Option(False, "--no-cache", help="Do not use cache when building the image")
 ):
     """Build a Docker container for the agent."""
-    if not _project_dir:
-        typer.echo("Error: Project directory not set. Use --project-dir or run from agent directory.", err=True)
-        raise typer.Exit(1)
+    project_dir = _require_project_dir(ctx)
         
-    dockerfile = _project_dir / "Dockerfile"
+    dockerfile = project_dir / "Dockerfile"
     if not dockerfile.exists():
-        typer.echo(f"Error: Dockerfile not found in {_project_dir}", err=True)
+        typer.echo(f"Error: Dockerfile not found in {project_dir}", err=True)
         raise typer.Exit(1)
         
     try:
         cmd = ["docker", "build", "-t", tag]
         if no_cache:
             cmd.append("--no-cache")
-        cmd.extend(["-f", str(dockerfile), str(_project_dir)])
+        cmd.extend(["-f", str(dockerfile), str(project_dir)])
         
         typer.echo(f"Building Docker image {tag}...")
         _run(cmd)
+        _container_exists.cache_clear()
         typer.echo(f"✅ Successfully built {tag}")
         
     except subprocess.CalledProcessError as e:
         typer.echo(f"Error building Docker image: {e}", err=True)
         raise typer.Exit(1)
 
-@APP.command("container-run", hidden=True)
 def container_run(
+    ctx: typer.Context,
     port: int = 8000,
     tag: str = "agent:latest",
     env_file: Optional[Path] = None,
@@ -534,14 +571,12 @@ def container_run(
     pass_aws_env: bool = True
 ):
     """Run the agent in a Docker container."""
-    if not _project_dir:
-        typer.echo("Error: Project directory not set. Use --project-dir or run from agent directory.", err=True)
-        raise typer.Exit(1)
+    project_dir = _require_project_dir(ctx)
     
     # Validate provider configuration and check if Bedrock is configured
     from ..environment import create_environment_manager
     env_manager = create_environment_manager()
-    is_valid, error_msg, providers = env_manager.validate_provider_configuration(_project_dir)
+    is_valid, error_msg, providers = env_manager.validate_provider_configuration(project_dir)
     
     if not is_valid:
         typer.echo(f"❌ Provider configuration error: {error_msg}", err=True)
@@ -558,10 +593,7 @@ def container_run(
     cmd = [
         "docker", "run",
         "-p", f"{port}:{port}",
-        "-v", f"{_project_dir}/src:/app/src",
-        "-v", f"{_project_dir}/requirements.txt:/app/requirements.txt",
-        "-v", f"{_project_dir}/.agent.yaml:/app/.agent.yaml",
-        "-v", f"{_project_dir}/container_entrypoint.py:/app/container_entrypoint.py",
+        *[arg.format(project_dir=project_dir) for arg in _DOCKER_RUN_MOUNTS],
         "--env", "PYTHONUNBUFFERED=1",
         "--env", f"PORT={port}"
     ]
@@ -574,12 +606,11 @@ def container_run(
     
     # 1. Handle .env file if provided
     env_file_path = None
+    # Keys set from the .env file, so host AWS variables don't override them
+    env_vars_set = set()
     if env_file:
-        # Handle both string and Path objects
-        if isinstance(env_file, str):
-            env_file_path = Path(env_file)
-        else:
-            env_file_path = env_file
+        # Handle both string and Path objects; relative paths are relative to the project
+        env_file_path = project_dir / env_file
             
         if env_file_path.exists():
             env_file_path = env_file_path.resolve()
@@ -587,15 +618,22 @@ def container_run(
             cmd.extend(["-v", f"{env_file_path}:/app/.env"])
             typer.echo(f"Using environment file: {env_file_path}")
             
-            # Also pass variables directly for immediate availability
+            # Let docker parse the variables for immediate availability; explicit
+            # --env flags added below still take precedence over --env-file
+            cmd.extend(["--env-file", str(env_file_path)])
+            
+            # Record the keys so host AWS variables don't override them
             try:
                 with open(env_file_path) as f:
                     for line in f:
                         line = line.strip()
-                        if line and not line.startswith('#'):
-                            key, value = line.split('=', 1)
-                            cmd.extend(["--env", f"{key}={value}"])
-                            typer.echo(f"Passing {key} from .env file")
+                        if not line or line[0] == '#':
+                            continue
+                        key, sep, _ = line.partition('=')
+                        if sep:
+                            env_vars_set.add(key)
+                if env_vars_set:
+                    typer.echo(f"Passing {', '.join(sorted(env_vars_set))} from .env file")
             except Exception as e:
                 typer.echo(f"Warning: Failed to read .env file: {e}", err=True)
     
@@ -605,8 +643,10 @@ def container_run(
         
         # 2. Handle AWS profile if specified (overrides .env AWS settings)
         if aws_profile:
+            # Only credentials and region are needed, so skip boto3's resource/client layer
+            import botocore.session
             try:
-                session = boto3.Session(profile_name=aws_profile)
+                session = botocore.session.Session(profile=aws_profile)
                 credentials = session.get_credentials()
                 if credentials:
                     aws_env = {
@@ -614,8 +654,9 @@ def container_run(
                         'AWS_SECRET_ACCESS_KEY': credentials.secret_key,
                     }
                     # Only set region if profile has one configured
-                    if session.region_name:
-                        aws_env['AWS_REGION'] = session.region_name
+                    region = session.get_config_variable('region')
+                    if region:
+                        aws_env['AWS_REGION'] = region
                     # Only add session token if it exists and is not empty
                     if credentials.token:
                         aws_env['AWS_SESSION_TOKEN'] = credentials.token
@@ -629,35 +670,19 @@ def container_run(
         
         # 3. Pass through AWS environment variables from host (only if not in .env file)
         if pass_aws_env:
-            aws_vars = [
-                'AWS_ACCESS_KEY_ID',
-                'AWS_SECRET_ACCESS_KEY',
-                'AWS_SESSION_TOKEN',
-                'AWS_REGION'
-            ]
-            
-            # Track which vars were already set from .env file
-            env_vars_set = set()
-            if env_file and env_file_path and env_file_path.exists():
-                try:
-                    with open(env_file_path) as f:
-                        for line in f:
-                            line = line.strip()
-                            if line and not line.startswith('#') and '=' in line:
-                                key = line.split('=', 1)[0]
-                                env_vars_set.add(key)
-                except Exception:
-                    pass
-            
-            for var in aws_vars:
-                # Only pass through host env vars if they weren't in .env file
-                if var not in env_vars_set:
-                    value = os.environ.get(var)
-                    if value:
-                        cmd.extend(["--env", f"{var}={value}"])
-                        typer.echo(f"Passing through {var} from host environment")
-                else:
-                    typer.echo(f"Skipping {var} from host (using .env file value)")
+            # Only pass through host env vars if they weren't in .env file
+            passed = {
+                var: value
+                for var in _HOST_AWS_VARS
+                if var not in env_vars_set and (value := os.environ.get(var))
+            }
+            for var, value in passed.items():
+                cmd.extend(["--env", f"{var}={value}"])
+            if passed:
+                typer.echo(f"Passing through {', '.join(passed)} from host environment")
+            skipped = [var for var in _HOST_AWS_VARS if var in env_vars_set]
+            if skipped:
+                typer.echo(f"Skipping {', '.join(skipped)} from host (using .env file values)")
         
         # Let boto3 handle region defaults - no hardcoded fallback
     else:
@@ -681,7 +706,6 @@ def container_run(
         typer.echo(f"Error running container: {e}", err=True)
         raise typer.Exit(1)
 
-@APP.command("build-ui", hidden=True)
 def build_ui():
     """Build the Next.js UI for the CLI."""
     from ..ui_builder import ui_builder
@@ -691,30 +715,28 @@ def build_ui():
     success = ui_builder.build_and_prepare()
     
     if success:
-        typer.echo("🎉 UI build completed successfully!")
-        typer.echo("The UI will now be available when running 'adt dev'")
+        typer.echo(
+            "🎉 UI build completed successfully!\n"
+            "The UI will now be available when running 'adt dev'"
+        )
     else:
         typer.echo("❌ UI build failed. Check that Node.js is installed.", err=True)
         typer.echo("Install Node.js from https://nodejs.org/", err=True)
         raise typer.Exit(1)
 
-@APP.command("regenerate-templates", hidden=True)
-def regenerate_templates():
+def regenerate_templates(ctx: typer.Context):
     """Regenerate server templates from master template.
     
     This command regenerates both local and container server code from the
     master template, ensuring they stay in sync with shared utilities.
     """
-    if not _project_dir:
-        typer.echo("Error: Project directory not set. Use --project-dir or run from agent directory.", err=True)
-        raise typer.Exit(1)
+    project_dir = _require_project_dir(ctx)
     
     from ..core.template_generator import template_generator
-    from pathlib import Path
     
     try:
         # Regenerate container entrypoint
-        container_path = _project_dir / "container_entrypoint.py"
+        container_path = project_dir / "container_entrypoint.py"
         template_generator.write_container_server(container_path)
         typer.echo(f"✅ Regenerated {container_path}")
         
@@ -730,8 +752,29 @@ def regenerate_templates():
         typer.echo(f"❌ Error regenerating templates: {e}", err=True)
         raise typer.Exit(1)
 
-@APP.command("add")
+_ERR_TOOL_EXISTS = "Error: Tool file {path} already exists!"
+_ERR_NO_TOOLS_DIR = "Error: No tools directory found. Are you in a valid agent project?"
+_ERR_UNKNOWN_TYPE = "Error: Unknown component type '{type}'"
+
+_TOOL_TEMPLATE = string.Template('''from strands import tool
+
+@tool
+def $name(input_text: str) -> str:
+    """Add a description of what $name does here.
+    
+    Args:
+        input_text: Description of the input parameter
+        
+    Returns:
+        str: Description of what this tool returns
+    """
+    # TODO: Implement $name functionality
+    return f"Tool $name received: {input_text}"
+''')
+
+
 def add(
+    ctx: typer.Context,
     type: str = typer.Argument(..., help="Type of component to add (currently only 'tool' is supported)"),
     name: str = typer.Argument(..., help="Name of the component")
 ):
@@ -744,61 +787,88 @@ def add(
         adt add tool weather_check
     """
     if type == "tool":
-        # Create the tools directory if it doesn't exist
-        tools_dir = Path("src/tools")
-        if not tools_dir.exists():
-            typer.echo("Error: No tools directory found. Are you in a valid agent project?", err=True)
-            raise typer.Exit(1)
-            
-        # Create individual tool file
-        tool_file = tools_dir / f"{name}.py"
-        if tool_file.exists():
-            typer.echo(f"Error: Tool file {tool_file} already exists!", err=True)
-            raise typer.Exit(1)
+        # Create individual tool file; O_EXCL fails atomically if it already exists,
+        # and a missing tools directory surfaces as FileNotFoundError
+        tool_file = os.path.join(_require_project_dir(ctx), "src", "tools", name + ".py")
+        try:
+            fd = os.open(tool_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            typer.echo(_ERR_TOOL_EXISTS.format(path=tool_file), err=True)
+            sys.exit(1)
+        except FileNotFoundError:
+            typer.echo(_ERR_NO_TOOLS_DIR, err=True)
+            sys.exit(1)
             
         # Create the new tool file with proper template
-        tool_code = f'''from strands import tool
-
-@tool
-def {name}(input_text: str) -> str:
-    """Add a description of what {name} does here.
-    
-    Args:
-        input_text: Description of the input parameter
-        
-    Returns:
-        str: Description of what this tool returns
-    """
-    # TODO: Implement {name} functionality
-    return f"Tool {name} received: {{input_text}}"
-'''
-        
-        tool_file.write_text(tool_code)
-        typer.echo(f"✨ Created new tool '{name}' in {tool_file}")
-        typer.echo("The tool will be automatically discovered by the agent.")
-        typer.echo("Edit the file to implement your tool's functionality!")
+        with os.fdopen(fd, "w") as f:
+            f.write(_TOOL_TEMPLATE.substitute(name=name))
+        typer.echo(
+            f"✨ Created new tool '{name}' in {tool_file}\n"
+            "The tool will be automatically discovered by the agent.\n"
+            "Edit the file to implement your tool's functionality!"
+        )
     else:
-        typer.echo(f"Error: Unknown component type '{type}'", err=True)
+        typer.echo(_ERR_UNKNOWN_TYPE.format(type=type), err=True)
         typer.echo("Available types: tool")
-        raise typer.Exit(1)
+        sys.exit(1)
+
+_ERR_CONTAINER_CHECK = "Error checking for running containers"
+
+
+@lru_cache(maxsize=1)
+def _docker_api_client():
+    """Return a Docker Engine API client, or None if the docker SDK is unavailable.
+
+    The client keeps one connection to the daemon for listing and stopping
+    containers instead of starting the docker CLI once per operation.
+    """
+    try:
+        import docker
+        return docker.from_env().api
+    except Exception:
+        # SDK not installed or daemon unreachable – callers fall back to the CLI
+        return None
+
+
+def _stop_containers_via_api(client) -> bool:
+    """Stop agent containers through the Engine API; return False to fall back to the CLI."""
+    try:
+        container_ids = [c["Id"] for c in client.containers(filters={"ancestor": "agent:latest"})]
+        if not container_ids:
+            typer.echo("No running agent containers found")
+            return True
+        if len(container_ids) == 1:
+            client.stop(container_ids[0])
+        else:
+            # Each stop blocks for the container's grace period, so issue them concurrently
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=min(8, len(container_ids))) as pool:
+                list(pool.map(client.stop, container_ids))
+        typer.echo(f"Stopped {len(container_ids)} container(s)")
+        return True
+    except Exception:
+        return False
+
 
-@APP.command("container-stop", hidden=True)
 def container_stop():
     """Stop all running agent containers."""
+    client = _docker_api_client()
+    if client is not None and _stop_containers_via_api(client):
+        return
+
     try:
         # Get all running container IDs
         result = subprocess.run(  # nosec B603 – shell=False, safe arg list
             ["docker", "ps", "-q", "--filter", "ancestor=agent:latest"],
-            capture_output=True,
-            text=True
+            capture_output=True
         )
         
         if result.returncode != 0:
-            typer.echo("Error checking for running containers", err=True)
+            typer.echo(_ERR_CONTAINER_CHECK, err=True)
             return
             
-        container_ids = result.stdout.strip().split('\n')
-        container_ids = [cid for cid in container_ids if cid]
+        # IDs are short ASCII hex, so decode only the lines rather than the whole stream
+        container_ids = [cid.decode("ascii") for cid in result.stdout.split() if cid]
         
         if not container_ids:
             typer.echo("No running agent containers found")
@@ -815,6 +885,57 @@ def container_stop():
 
 
 # ... (rest of the code remains the same)
+# ──────────────────────────────────────────────────────────────────────────────
+# Command registration
+# ──────────────────────────────────────────────────────────────────────────────
+
+# name → (function, APP.command kwargs)
+_COMMANDS: Dict[str, tuple] = {
+    "init": (init, {"help": _INIT_HELP}),
+    "dev": (dev, {"help": "Run the agent in a development server"}),
+    "cluster-bootstrap": (cluster_bootstrap, {"help": "Provision the shared ECS cluster (one-time) – stub", "hidden": True}),
+    "deploy": (deploy, {"help": "Build, push & deploy (stub)", "hidden": True}),
+    "list": (list_, {"help": "List agents (stub)", "hidden": True}),
+    "logs": (logs, {"help": "Tail logs (stub)", "hidden": True}),
+    "destroy": (destroy, {"help": "Remove agent (stub)", "hidden": True}),
+    "container-build": (container_build, {"hidden": True}),
+    "container-run": (container_run, {"hidden": True}),
+    "build-ui": (build_ui, {"hidden": True}),
+    "regenerate-templates": (regenerate_templates, {"hidden": True}),
+    "add": (add, {}),
+    "container-stop": (container_stop, {"hidden": True}),
+}
+
+# Root options that consume the following argv element as their value
+_ROOT_VALUE_OPTIONS = frozenset({"--project-dir", "-d"})
+
+
+def _sniff_subcommand(argv: List[str]) -> Optional[str]:
+    """Return the first positional argument in ``argv`` (the subcommand), if any."""
+    args = iter(argv)
+    for arg in args:
+        if arg in _ROOT_VALUE_OPTIONS:
+            next(args, None)
+        elif not arg.startswith("-"):
+            return arg
+    return None
+
+
+def _register_commands() -> None:
+    """Register only the invoked subcommand, or all of them when it is unknown.
+
+    Falling back to the full table keeps ``adt --help`` and typo suggestions intact.
+    """
+    sub = _sniff_subcommand(sys.argv[1:])
+    names = [sub] if sub in _COMMANDS else list(_COMMANDS)
+    for name in names:
+        func, kwargs = _COMMANDS[name]
+        APP.command(name, **kwargs)(func)
+
+
+_register_commands()
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Entrypoint
 # ──────────────────────────────────────────────────────────────────────────────
@@ -822,24 +943,7 @@ def container_stop():
 
 def cli() -> None:
     """Main CLI entry point."""
-    global _original_dir
-    
-    # Capture original directory when CLI starts
-    try:
-        _original_dir = Path.cwd().resolve()
-    except (FileNotFoundError, OSError, PermissionError):
-        _original_dir = Path.home().resolve()
-    
-    try:
-        APP()
-    finally:
-        # Restore original directory when done (if it exists)
-        if _original_dir and _original_dir.exists():
-            try:
-                os.chdir(_original_dir)
-            except (FileNotFoundError, OSError, PermissionError):
-                # Directory might have been deleted or inaccessible, ignore
-                pass
+    APP()
 
 def main():
     """Entry point for pip installation."""
@@ -5,9 +5,8 @@
 Core utilities for Agent Development Kit (ADT) for Strands.
 """
 
-from .template_generator import ServerTemplateGenerator
+# Importing the submodule binds it as the package attribute ``template_generator``;
+# the from-import below rebinds that name to the submodule's global instance.
+from .template_generator import ServerTemplateGenerator, template_generator
 
-# Create a global instance for easy access
-template_generator = ServerTemplateGenerator()
-
-__all__ = ["template_generator", "ServerTemplateGenerator"] 
\ No newline at end of file
+__all__ = ["template_generator", "ServerTemplateGenerator"]
@@ -22,14 +22,39 @@ Generated from agentcli/core/agent_server.py.j2 - DO NOT EDIT MANUALLY
 
 import os
 import sys
+import queue
+import atexit
+import asyncio
+import logging
+from logging.handlers import QueueHandler, QueueListener
 import uvicorn
+import importlib
 import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 from pydantic import BaseModel
 
+import json
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# orjson serializes the nested /chat trace payload much faster than the stdlib encoder
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class DefaultResponse(JSONResponse):
+    """JSON response rendered with orjson when it is installed."""
+
+    def render(self, content) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content)
+
 
 # Add the app directory to Python path
 sys.path.insert(0, '/app')
@@ -44,55 +69,172 @@ sys.path.insert(0, '/app/src')
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 
+def _block_text(item) -> str:
+    """Return the text of one content block."""
+    if isinstance(item, dict) and 'text' in item:
+        return item['text']
+    elif hasattr(item, 'text'):
+        return item.text
+    elif isinstance(item, str):
+        return item
+    else:
+        return str(item)
+
 def extract_response_text(response) -> str:
     """Extract text content from various response formats."""
+    if isinstance(response, str):
+        return response
     if hasattr(response, 'message'):
         return str(response.message)
     elif hasattr(response, 'content'):
         if isinstance(response.content, list):
-            # Handle list of content blocks (e.g., [{"text": "..."}])
-            text_parts = []
-            for item in response.content:
-                if isinstance(item, dict) and 'text' in item:
-                    text_parts.append(item['text'])
-                elif hasattr(item, 'text'):
-                    text_parts.append(item.text)
-                else:
-                    text_parts.append(str(item))
-            return ' '.join(text_parts)
+            # Handle list of content blocks (e.g., [{"text": "..."}]); join() materializes
+            # its argument anyway, so a list comprehension is the cheapest feed
+            return ' '.join([_block_text(item) for item in response.content])
         else:
             return str(response.content)
     elif hasattr(response, 'text'):
         return str(response.text)
     else:
-        return str(response) 
+        return str(response)
+
 
 # trace_utils.py  
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 
+import itertools
+import logging
+import threading
 import time
+import weakref
+from dataclasses import dataclass, fields
 from typing import Dict, Any, Optional, List
 
+@dataclass(slots=True)
+class _SnapCounters:
+    """Cumulative usage counters (per-agent snapshot or session running totals)."""
+    inputTokens: int = 0
+    outputTokens: int = 0
+    totalTokens: int = 0
+    cycles: int = 0
+    latencyMs: int = 0
+
+logger = logging.getLogger(__name__)
+
+@dataclass(slots=True)
+class PerMessage:
+    """Metrics and trace slices for a single chat turn."""
+    token_delta: Dict[str, int]
+    new_cycles: int
+    latency_ms: int
+    message_contents: List[str]
+    tool_calls: List[Dict[str, Any]]
+    tool_usage: Dict[str, Any]
+    new_traces: List[Dict[str, Any]]
+    metrics_summary: Dict[str, Any]
+
 # --- Global state -----------------------------------------------------------------
+# Guards the read-modify-write of the two tables below across concurrent requests.
+_METRICS_LOCK = threading.Lock()
+
 # Per-agent snapshot table keyed by id(agent) → last cumulative counters seen.
-_agent_snapshots: dict[int, Dict[str, Any]] = {}
+_agent_snapshots: dict[int, _SnapCounters] = {}
 
 # Running totals for the current UI session (reset when chat window reloads)
-_session_totals = {
-    'inputTokens': 0,
-    'outputTokens': 0,
-    'totalTokens': 0,
-    'cycles': 0,
-    'latencyMs': 0
-}
+_session_totals = _SnapCounters()
+
+# Monotonic message-ID source, seeded from boot time so IDs stay unique across restarts
+_MID = itertools.count(time.time_ns() // 1000)
+
+# Per-agent display metadata keyed by id(agent) → {'model': ..., 'name': ...}
+_agent_meta: dict[int, Dict[str, Any]] = {}
+
+# Backstop for agents that cannot be weak-referenced: oldest snapshots are evicted past this
+_MAX_TRACKED_AGENTS = 1024
 
-def extract_strands_trace_data(agent_response, message_id: str = None, *, agent=None) -> Optional[Dict[str, Any]]:
+# id(agent) → finalizer that drops the agent's entries once it is garbage collected
+_agent_finalizers: dict[int, weakref.finalize] = {}
+
+def _forget_agent(key: int):
+    """Drop per-agent state so a recycled id() never inherits a dead agent's snapshot."""
+    # Runs from GC, possibly while _METRICS_LOCK is held; single dict ops need no lock
+    _agent_snapshots.pop(key, None)
+    _agent_meta.pop(key, None)
+    _agent_finalizers.pop(key, None)
+
+def _track_agent(agent, key: int):
+    """Tie the per-agent tables to the agent's lifetime (or bound them when that is impossible)."""
+    if key in _agent_finalizers:
+        return
+    try:
+        _agent_finalizers[key] = weakref.finalize(agent, _forget_agent, key)
+    except TypeError:
+        # Not weak-referenceable: keep the tables bounded instead
+        while len(_agent_snapshots) > _MAX_TRACKED_AGENTS:
+            _agent_snapshots.pop(next(iter(_agent_snapshots)), None)
+        while len(_agent_meta) > _MAX_TRACKED_AGENTS:
+            _agent_meta.pop(next(iter(_agent_meta)), None)
+
+def resolve_agent_meta(agent) -> Dict[str, Any]:
+    """Resolve an agent's model id and display name once and cache them.
+
+    ``model`` is None when the agent has no model object; callers pick their
+    own fallback for that case.
+    """
+    key = id(agent)
+    meta = _agent_meta.get(key)
+    if meta is not None:
+        return meta
+    
+    model = None
+    if hasattr(agent, 'model') and agent.model:
+        # Extract model ID from the model object with error handling
+        model_obj = agent.model
+        try:
+            if hasattr(model_obj, 'model_id'):
+                model = str(model_obj.model_id)
+            elif hasattr(model_obj, 'model'):
+                model = str(model_obj.model)
+            elif hasattr(model_obj, 'model_name'):
+                model = str(model_obj.model_name)
+            elif hasattr(model_obj, '_model_id'):
+                model = str(model_obj._model_id)
+            elif hasattr(model_obj, '__dict__') and 'model_id' in model_obj.__dict__:
+                model = str(model_obj.__dict__['model_id'])
+            else:
+                # Safe extraction from model class name
+                try:
+                    class_name = model_obj.__class__.__name__
+                    if 'Bedrock' in class_name:
+                        model = "BedrockModel"
+                    elif 'Anthropic' in class_name:
+                        model = "AnthropicModel"
+                    elif 'OpenAI' in class_name:
+                        model = "OpenAIModel"
+                    else:
+                        model = class_name
+                except (AttributeError, TypeError):
+                    model = "Unknown Model"
+        except (AttributeError, TypeError, ValueError):
+            # Fallback if any attribute access or str() conversion fails
+            model = "Unknown Model"
+    
+    if hasattr(agent, 'name') and agent.name:
+        name = agent.name
+    else:
+        name = agent.__class__.__name__
+    
+    meta = _agent_meta[key] = {'model': model, 'name': name}
+    _track_agent(agent, key)
+    return meta
+
+def extract_strands_trace_data(agent_response, message_id: str = None, *, agent=None, debug: bool = False) -> Optional[Dict[str, Any]]:
     """Extract trace data from Strands agent response using get_summary()."""
     
     # Check if it's a Strands AgentResult object with metrics
     if not hasattr(agent_response, 'metrics'):
-        print("❌ No metrics found in agent response")
+        logger.info("❌ No metrics found in agent response")
         return None
     
     try:
@@ -101,21 +243,79 @@ def extract_strands_trace_data(agent_response, message_id: str = None, *, agent=
         
         # Generate message ID if not provided
         if not message_id:
-            message_id = f"msg_{int(time.time() * 1000000)}"
+            message_id = f"msg_{next(_MID)}"
         
         per_message_data = calculate_per_message_metrics(summary, agent)
         
-        # Inject raw metrics summary for downstream debug output
-        per_message_data['metrics_summary'] = summary
-        
         # Convert to UI format
-        return convert_to_ui_format(agent_response, per_message_data, message_id, agent=agent)
+        return convert_to_ui_format(agent_response, per_message_data, message_id, agent=agent, debug=debug)
         
     except Exception as e:
-        print(f"❌ Error extracting trace data: {e}")
+        logger.error("❌ Error extracting trace data: %s", e)
         return None
 
-def calculate_per_message_metrics(current_summary: Dict[str, Any], agent_obj) -> Dict[str, Any]:
+def _index_tool_results(children: List[Dict[str, Any]]) -> Dict[str, str]:
+    """Map toolUseId -> result text for the tool spans among a trace's children.
+
+    Keeps the first span with content per id and, within it, the last text
+    block, matching what the per-toolUse scan used to return.
+    """
+    tool_results = {}
+    for child in children:
+        if 'Tool:' not in child.get('name', ''):
+            continue
+        tool_id = child.get('metadata', {}).get('toolUseId')
+        content = child.get('message', {}).get('content')
+        if not content or tool_id in tool_results:
+            continue
+        tool_result = ""
+        for result_item in content:
+            if isinstance(result_item, dict) and 'toolResult' in result_item:
+                for content_item in result_item['toolResult'].get('content', []):
+                    if isinstance(content_item, dict) and 'text' in content_item:
+                        tool_result = content_item['text']
+        tool_results[tool_id] = tool_result
+    return tool_results
+
+def _extract_contents_and_tools(new_traces: List[Dict[str, Any]]):
+    """Collect assistant text blocks and tool calls (with their results) from traces."""
+    message_contents = []
+    tool_calls = []
+    
+    for trace in new_traces:
+        children = trace.get('children', [])
+        tool_results = None
+        for child in children:
+            # Extract assistant messages
+            if child.get('name') != 'stream_messages':
+                continue
+            message = child.get('message', {})
+            if message.get('role') != 'assistant':
+                continue
+            for item in message.get('content', []):
+                if not isinstance(item, dict):
+                    continue
+                if 'text' in item:
+                    message_contents.append(item['text'])
+                # Extract tool use from assistant message
+                elif 'toolUse' in item:
+                    tool_use = item['toolUse']
+                    tool_id = tool_use.get('toolUseId', '')
+                    
+                    # Look up the corresponding tool result (index built once per trace)
+                    if tool_results is None:
+                        tool_results = _index_tool_results(children)
+                    
+                    tool_calls.append({
+                        'id': tool_id,
+                        'name': tool_use.get('name', 'unknown'),
+                        'parameters': tool_use.get('input', {}),
+                        'result': tool_results.get(tool_id, "")
+                    })
+    
+    return message_contents, tool_calls
+
+def calculate_per_message_metrics(current_summary: Dict[str, Any], agent_obj) -> PerMessage:
     """Calculate per-message metrics by tracking deltas from previous state.
 
     When the caller does not provide a persistent ``agent_obj`` (``agent_obj is None``)
@@ -123,126 +323,89 @@ def calculate_per_message_metrics(current_summary: Dict[str, Any], agent_obj) ->
     bookkeeping that enables cumulative-to-delta conversion for long-lived agents.
     """
     
-    global _agent_snapshots, _session_totals
-    
     # Current cumulative numbers ----
     curr_usage = current_summary.get('accumulated_usage', {})
     curr_cycles = current_summary.get('total_cycles', 0)
     curr_latency = current_summary.get('accumulated_metrics', {}).get('latencyMs', 0)
 
-    # If we were not given the agent object, treat values as already per-message.
-    if agent_obj is None:
-        delta_usage = curr_usage
-        delta_cycles = curr_cycles
-        delta_latency = curr_latency
-    else:
-        key = id(agent_obj)
-        prev_snapshot = _agent_snapshots.get(key, None)
+    with _METRICS_LOCK:
+        # Without the agent object, treat values as already per-message and keep no snapshot
+        prev_snapshot = None
+        if agent_obj is not None:
+            key = id(agent_obj)
+            prev_snapshot = _agent_snapshots.get(key)
+            _agent_snapshots[key] = _SnapCounters(
+                curr_usage.get('inputTokens', 0),
+                curr_usage.get('outputTokens', 0),
+                curr_usage.get('totalTokens', 0),
+                curr_cycles,
+                curr_latency
+            )
+            if prev_snapshot is None:
+                _track_agent(agent_obj, key)
 
         if prev_snapshot is None:
-            # first call on this agent
+            # first call on this agent (or no agent at all)
             delta_usage = curr_usage
             delta_cycles = curr_cycles
             delta_latency = curr_latency
         else:
-            prev_cycles_val = prev_snapshot['cycles']
             delta_usage = {
-                'inputTokens': max(0, curr_usage.get('inputTokens', 0) - prev_snapshot['inputTokens']),
-                'outputTokens': max(0, curr_usage.get('outputTokens', 0) - prev_snapshot['outputTokens']),
-                'totalTokens': max(0, curr_usage.get('totalTokens', 0) - prev_snapshot['totalTokens'])
-            }
-            delta_cycles = max(0, curr_cycles - prev_cycles_val)
-            delta_latency = max(0, curr_latency - prev_snapshot['latencyMs'])
-
-        # Save snapshot back only when we have an agent object (persistent path)
-        if agent_obj is not None:
-            _agent_snapshots[key] = {
-                'inputTokens': curr_usage.get('inputTokens', 0),
-                'outputTokens': curr_usage.get('outputTokens', 0),
-                'totalTokens': curr_usage.get('totalTokens', 0),
-                'cycles': curr_cycles,
-                'latencyMs': curr_latency
+                'inputTokens': max(0, curr_usage.get('inputTokens', 0) - prev_snapshot.inputTokens),
+                'outputTokens': max(0, curr_usage.get('outputTokens', 0) - prev_snapshot.outputTokens),
+                'totalTokens': max(0, curr_usage.get('totalTokens', 0) - prev_snapshot.totalTokens)
             }
+            delta_cycles = max(0, curr_cycles - prev_snapshot.cycles)
+            delta_latency = max(0, curr_latency - prev_snapshot.latencyMs)
 
-    # ---------------- session totals ----------------
-    _session_totals['inputTokens'] += delta_usage.get('inputTokens', 0)
-    _session_totals['outputTokens'] += delta_usage.get('outputTokens', 0)
-    _session_totals['totalTokens'] += delta_usage.get('totalTokens', 0)
-    _session_totals['cycles'] += delta_cycles
-    _session_totals['latencyMs'] += delta_latency
+        # ---------------- session totals ----------------
+        totals = _session_totals
+        totals.inputTokens += delta_usage.get('inputTokens', 0)
+        totals.outputTokens += delta_usage.get('outputTokens', 0)
+        totals.totalTokens += delta_usage.get('totalTokens', 0)
+        totals.cycles += delta_cycles
+        totals.latencyMs += delta_latency
 
     token_delta = delta_usage
     new_cycles = delta_cycles
     latency_delta = delta_latency
     
     # Determine previous cycle index for slicing traces
-    if agent_obj is None:
-        prev_cycles_index = 0
-    else:
-        prev_cycles_index = prev_snapshot['cycles'] if 'prev_snapshot' in locals() and prev_snapshot else 0
+    prev_cycles_index = prev_snapshot.cycles if prev_snapshot else 0
 
     # Get only the new traces (cycles) for this message
     all_traces = current_summary.get('traces', [])
     new_traces = all_traces[prev_cycles_index:curr_cycles] if prev_cycles_index < len(all_traces) else []
     
     # Extract message content and tool calls from traces
-    message_contents = []
-    tool_calls = []
-    
-    for trace in new_traces:
-        for child in trace.get('children', []):
-            # Extract assistant messages
-            if child.get('name') == 'stream_messages' and child.get('message', {}).get('role') == 'assistant':
-                content = child.get('message', {}).get('content', [])
-                for item in content:
-                    if isinstance(item, dict) and 'text' in item:
-                        message_contents.append(item['text'])
-                    # Extract tool use from assistant message
-                    elif isinstance(item, dict) and 'toolUse' in item:
-                        tool_use = item['toolUse']
-                        tool_id = tool_use.get('toolUseId', '')
-                        tool_name = tool_use.get('name', 'unknown')
-                        tool_input = tool_use.get('input', {})
-                        
-                        # Find the corresponding tool result
-                        tool_result = ""
-                        for other_child in trace.get('children', []):
-                            if 'Tool:' in other_child.get('name', '') and other_child.get('metadata', {}).get('toolUseId') == tool_id:
-                                # Extract tool result
-                                if other_child.get('message', {}).get('content'):
-                                    for result_item in other_child['message']['content']:
-                                        if isinstance(result_item, dict) and 'toolResult' in result_item:
-                                            result_content = result_item['toolResult'].get('content', [])
-                                            for content_item in result_content:
-                                                if isinstance(content_item, dict) and 'text' in content_item:
-                                                    tool_result = content_item['text']
-                                break
-                        
-                        tool_calls.append({
-                            'id': tool_id,
-                            'name': tool_name,
-                            'parameters': tool_input,
-                            'result': tool_result
-                        })
+    message_contents, tool_calls = _extract_contents_and_tools(new_traces)
     
     # Get tool usage for this message
     tool_usage = current_summary.get('tool_usage', {})
     
     # Note: no per-agent snapshot update when ``agent_obj`` is None
     
-    return {
-        'token_delta': token_delta,
-        'new_cycles': new_cycles,
-        'latency_ms': latency_delta,
-        'message_contents': message_contents,
-        'tool_calls': tool_calls,
-        'tool_usage': tool_usage,
-        'new_traces': new_traces,
-        'metrics_summary': current_summary
-    }
+    return PerMessage(
+        token_delta=token_delta,
+        new_cycles=new_cycles,
+        latency_ms=latency_delta,
+        message_contents=message_contents,
+        tool_calls=tool_calls,
+        tool_usage=tool_usage,
+        new_traces=new_traces,
+        metrics_summary=current_summary
+    )
+
+def _trace_outline(traces: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Reduce raw cycle traces to their id, name and duration."""
+    return [{'id': t.get('id'), 'name': t.get('name'), 'duration': t.get('duration')} for t in traces]
 
-def convert_to_ui_format(agent_response, per_message_data: Dict[str, Any], message_id: str, *, agent=None) -> Dict[str, Any]:
-    """Convert per-message data to UI-compatible format."""
+def convert_to_ui_format(agent_response, per_message_data: PerMessage, message_id: str, *, agent=None, debug: bool = False) -> Dict[str, Any]:
+    """Convert per-message data to UI-compatible format.
+
+    The raw metrics summary and full cycle traces are only included when
+    ``debug`` is set; otherwise traces are reduced to an outline.
+    """
     
     # Extract response text
     response_text = str(agent_response) if agent_response else ""
@@ -252,53 +415,29 @@ def convert_to_ui_format(agent_response, per_message_data: Dict[str, Any], messa
     agent_name = "Strands Agent"
     
     if agent:
-        if hasattr(agent, 'model') and agent.model:
-            # Extract model ID from the model object with error handling
-            model_obj = agent.model
-            try:
-                if hasattr(model_obj, 'model_id'):
-                    actual_model = str(model_obj.model_id)
-                elif hasattr(model_obj, 'model'):
-                    actual_model = str(model_obj.model)
-                elif hasattr(model_obj, 'model_name'):
-                    actual_model = str(model_obj.model_name)
-                elif hasattr(model_obj, '_model_id'):
-                    actual_model = str(model_obj._model_id)
-                elif hasattr(model_obj, '__dict__') and 'model_id' in model_obj.__dict__:
-                    actual_model = str(model_obj.__dict__['model_id'])
-                else:
-                    # Safe extraction from model class name
-                    try:
-                        class_name = model_obj.__class__.__name__
-                        if 'Bedrock' in class_name:
-                            actual_model = "BedrockModel"
-                        elif 'Anthropic' in class_name:
-                            actual_model = "AnthropicModel"
-                        elif 'OpenAI' in class_name:
-                            actual_model = "OpenAIModel"
-                        else:
-                            actual_model = class_name
-                    except (AttributeError, TypeError):
-                        actual_model = "Unknown Model"
-            except (AttributeError, TypeError, ValueError):
-                # Fallback if any attribute access or str() conversion fails
-                actual_model = "Unknown Model"
-        if hasattr(agent, 'name') and agent.name:
-            agent_name = agent.name
-        elif hasattr(agent, '__class__'):
-            agent_name = agent.__class__.__name__
-    
-    current_time = time.time()
+        meta = resolve_agent_meta(agent)
+        actual_model = meta['model'] or actual_model
+        agent_name = meta['name']
+    
+    # One clock read per message; the integer form gives the trace id without float math
+    now_ns = time.time_ns()
+    current_time = now_ns / 1e9
+    metrics_summary = per_message_data.metrics_summary if debug else None
+    token_delta = per_message_data.token_delta
+    
+    # Tokens are spread evenly across the cycles of this message
+    cycles_denom = max(1, per_message_data.new_cycles)
+    cycle_tokens = {
+        "prompt_tokens": token_delta['inputTokens'] // cycles_denom,
+        "completion_tokens": token_delta['outputTokens'] // cycles_denom,
+        "total_tokens": token_delta['totalTokens'] // cycles_denom
+    }
     
     # Build cycles from per-message traces
     cycles = []
-    llm_calls = []
     tool_calls = []
     
-    for i, trace in enumerate(per_message_data['new_traces']):
-        cycle_id = trace.get('id', f'cycle_{i+1}')
-        cycle_name = trace.get('name', f'Cycle {i+1}')
-        
+    for i, trace in enumerate(per_message_data.new_traces):
         # Get completion text for this cycle
         completion_text = ""
         for child in trace.get('children', []):
@@ -308,35 +447,30 @@ def convert_to_ui_format(agent_response, per_message_data: Dict[str, Any], messa
                     if isinstance(item, dict) and 'text' in item:
                         completion_text += item['text'] + " "
         
-        cycle = {
-            "cycle_id": cycle_id,
+        cycles.append({
+            "cycle_id": trace.get('id', f'cycle_{i+1}'),
             "prompt": "User message",
             "completion": completion_text.strip() or response_text,
             "start_time": trace.get('start_time', current_time),
             "end_time": trace.get('end_time', current_time + 1),
             "duration_ms": int(trace.get('duration', 1) * 1000) if trace.get('duration') else 1000,
             "spans": []
-        }
-        cycles.append(cycle)
-        
-        # Create LLM call for this cycle
-        llm_calls.append({
-            "call_id": f"llm_{cycle_id}",
-            "model": actual_model,
-            "start_time": cycle['start_time'],
-            "end_time": cycle['end_time'],
-            "duration_ms": cycle['duration_ms'],
-            "prompt": "User message",
-            "completion": completion_text.strip() or response_text,
-            "tokens": {
-                "prompt_tokens": per_message_data['token_delta']['inputTokens'] // max(1, per_message_data['new_cycles']),
-                "completion_tokens": per_message_data['token_delta']['outputTokens'] // max(1, per_message_data['new_cycles']),
-                "total_tokens": per_message_data['token_delta']['totalTokens'] // max(1, per_message_data['new_cycles'])
-            }
         })
     
+    # One LLM call per cycle; the token split is shared since it is only serialized
+    llm_calls = [{
+        "call_id": f"llm_{cycle['cycle_id']}",
+        "model": actual_model,
+        "start_time": cycle['start_time'],
+        "end_time": cycle['end_time'],
+        "duration_ms": cycle['duration_ms'],
+        "prompt": cycle['prompt'],
+        "completion": cycle['completion'],
+        "tokens": cycle_tokens
+    } for cycle in cycles]
+    
     # Convert tool calls
-    for i, tool_data in enumerate(per_message_data['tool_calls']):
+    for i, tool_data in enumerate(per_message_data.tool_calls):
         tool_calls.append({
             "tool_id": tool_data.get('id', f"tool_{i+1}"),
             "tool_name": tool_data['name'],
@@ -347,11 +481,13 @@ def convert_to_ui_format(agent_response, per_message_data: Dict[str, Any], messa
             "result": tool_data.get('result', '')
         })
     
-    print(f"🎯 Per-message: {per_message_data['new_cycles']} cycles, {per_message_data['token_delta']['totalTokens']} tokens, {len(tool_calls)} tool calls")
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("🎯 Per-message: %s cycles, %s tokens, %s tool calls",
+                    per_message_data.new_cycles, token_delta['totalTokens'], len(tool_calls))
     
     return {
         "message_id": message_id,
-        "trace_id": f"trace_{int(current_time * 1000000)}",
+        "trace_id": f"trace_{now_ns // 1000}",
         "has_real_traces": True,
         "response_text": response_text,
         "message_text": "",
@@ -362,57 +498,63 @@ def convert_to_ui_format(agent_response, per_message_data: Dict[str, Any], messa
             "agent.name": agent_name,
             "gen_ai.agent.name": agent_name,
             "gen_ai.request.model": actual_model,
-            "gen_ai.usage.prompt_tokens": per_message_data['token_delta']['inputTokens'],
-            "gen_ai.usage.completion_tokens": per_message_data['token_delta']['outputTokens'],
-            "gen_ai.usage.total_tokens": per_message_data['token_delta']['totalTokens'],
+            "gen_ai.usage.prompt_tokens": token_delta['inputTokens'],
+            "gen_ai.usage.completion_tokens": token_delta['outputTokens'],
+            "gen_ai.usage.total_tokens": token_delta['totalTokens'],
             "mode": "local"
         },
         "cycles": cycles,
         "llm_calls": llm_calls,
         "tool_calls": tool_calls,
-        "total_duration_ms": per_message_data['latency_ms'],
+        "total_duration_ms": per_message_data.latency_ms,
         "total_tokens": {
-            "prompt_tokens": per_message_data['token_delta']['inputTokens'],
-            "completion_tokens": per_message_data['token_delta']['outputTokens'],
-            "total_tokens": per_message_data['token_delta']['totalTokens']
+            "prompt_tokens": token_delta['inputTokens'],
+            "completion_tokens": token_delta['outputTokens'],
+            "total_tokens": token_delta['totalTokens']
         },
-        "metrics_summary": per_message_data.get('metrics_summary'),
+        "metrics_summary": metrics_summary,
         
         # Debug info
         "debug_info": {
-            "new_cycles": per_message_data['new_cycles'],
-            "message_contents": per_message_data['message_contents'],
-            "new_traces": per_message_data['new_traces'],
-            "metrics_summary": per_message_data.get('metrics_summary')
+            "new_cycles": per_message_data.new_cycles,
+            "message_contents": per_message_data.message_contents,
+            "new_traces": per_message_data.new_traces if debug else _trace_outline(per_message_data.new_traces),
+            "metrics_summary": metrics_summary
         }
     }
 
 def reset_metrics_state():
     """Reset the global metrics state (useful for testing or new sessions)."""
-    global _agent_snapshots, _session_totals
-    _agent_snapshots.clear()
-    _session_totals.clear()
-    print("🔄 Reset metrics state")
+    with _METRICS_LOCK:
+        _agent_snapshots.clear()
+        for finalizer in list(_agent_finalizers.values()):
+            finalizer.detach()
+        _agent_finalizers.clear()
+        _agent_meta.clear()
+        # Zero in place so references to the totals object stay valid
+        for field in fields(_session_totals):
+            setattr(_session_totals, field.name, 0)
+    logger.info("🔄 Reset metrics state")
 
 def get_trace_data(agent_response, message: str, response_text: str, model_name: str, mode: str = "local", real_tool_calls: list = None) -> Optional[Dict[str, Any]]:
     """Get trace data from agent response."""
     
     # Generate a unique message ID
-    message_id = f"msg_{hash(message) % 100000}_{int(time.time() * 1000)}"
+    message_id = f"msg_{next(_MID)}"
     
     # Extract trace data
     trace_data = extract_strands_trace_data(agent_response, message_id)
     
     if trace_data:
-        print("✅ Using REAL Strands trace data with per-message metrics")
+        logger.debug("✅ Using REAL Strands trace data with per-message metrics")
         # Update with the actual message text
         trace_data['message_text'] = message
         return trace_data
     else:
-        print("❌ No real Strands trace data found")
+        logger.info("❌ No real Strands trace data found")
         return None
 
-def extract_direct_metrics_from_response(agent_response, message_id: str = None) -> Optional[Dict[str, Any]]:
+def extract_direct_metrics_from_response(agent_response, message_id: str = None, *, debug: bool = False) -> Optional[Dict[str, Any]]:
     """Extract metrics directly from agent response without delta tracking.
     
     This is useful for temporary agents where global delta tracking doesn't work.
@@ -420,7 +562,7 @@ def extract_direct_metrics_from_response(agent_response, message_id: str = None)
     
     # Check if it's a Strands AgentResult object with metrics
     if not hasattr(agent_response, 'metrics'):
-        print("❌ No metrics found in agent response")
+        logger.info("❌ No metrics found in agent response")
         return None
     
     try:
@@ -429,7 +571,7 @@ def extract_direct_metrics_from_response(agent_response, message_id: str = None)
         
         # Generate message ID if not provided
         if not message_id:
-            message_id = f"msg_{int(time.time() * 1000000)}"
+            message_id = f"msg_{next(_MID)}"
         
         # Extract metrics directly (no delta calculation)
         current_usage = summary.get('accumulated_usage', {})
@@ -441,66 +583,29 @@ def extract_direct_metrics_from_response(agent_response, message_id: str = None)
         new_traces = all_traces
         
         # Extract message content and tool calls from traces
-        message_contents = []
-        tool_calls = []
-        
-        for trace in new_traces:
-            for child in trace.get('children', []):
-                # Extract assistant messages
-                if child.get('name') == 'stream_messages' and child.get('message', {}).get('role') == 'assistant':
-                    content = child.get('message', {}).get('content', [])
-                    for item in content:
-                        if isinstance(item, dict) and 'text' in item:
-                            message_contents.append(item['text'])
-                        # Extract tool use from assistant message
-                        elif isinstance(item, dict) and 'toolUse' in item:
-                            tool_use = item['toolUse']
-                            tool_id = tool_use.get('toolUseId', '')
-                            tool_name = tool_use.get('name', 'unknown')
-                            tool_input = tool_use.get('input', {})
-                            
-                            # Find the corresponding tool result
-                            tool_result = ""
-                            for other_child in trace.get('children', []):
-                                if 'Tool:' in other_child.get('name', '') and other_child.get('metadata', {}).get('toolUseId') == tool_id:
-                                    # Extract tool result
-                                    if other_child.get('message', {}).get('content'):
-                                        for result_item in other_child['message']['content']:
-                                            if isinstance(result_item, dict) and 'toolResult' in result_item:
-                                                result_content = result_item['toolResult'].get('content', [])
-                                                for content_item in result_content:
-                                                    if isinstance(content_item, dict) and 'text' in content_item:
-                                                        tool_result = content_item['text']
-                                        break
-                            
-                            tool_calls.append({
-                                'id': tool_id,
-                                'name': tool_name,
-                                'parameters': tool_input,
-                                'result': tool_result
-                            })
+        message_contents, tool_calls = _extract_contents_and_tools(new_traces)
         
         # Build direct metrics (no delta calculation)
-        direct_metrics = {
-            'token_delta': {
+        direct_metrics = PerMessage(
+            token_delta={
                 'inputTokens': current_usage.get('inputTokens', 0),
                 'outputTokens': current_usage.get('outputTokens', 0),
                 'totalTokens': current_usage.get('totalTokens', 0)
             },
-            'new_cycles': current_cycles,
-            'latency_ms': current_latency,
-            'message_contents': message_contents,
-            'tool_calls': tool_calls,
-            'tool_usage': summary.get('tool_usage', {}),
-            'new_traces': new_traces,
-            'metrics_summary': summary
-        }
+            new_cycles=current_cycles,
+            latency_ms=current_latency,
+            message_contents=message_contents,
+            tool_calls=tool_calls,
+            tool_usage=summary.get('tool_usage', {}),
+            new_traces=new_traces,
+            metrics_summary=summary
+        )
         
         # Convert to UI format
-        return convert_to_ui_format(agent_response, direct_metrics, message_id)
+        return convert_to_ui_format(agent_response, direct_metrics, message_id, debug=debug)
         
     except Exception as e:
-        print(f"❌ Error extracting direct metrics: {e}")
+        logger.error("❌ Error extracting direct metrics: %s", e)
         return None 
 
 
@@ -512,6 +617,107 @@ def extract_direct_metrics_from_response(agent_response, message_id: str = None)
 class AgentRequest(BaseModel):
     message: str
 
+# Agent calls block for a whole LLM round-trip; run them off the event loop
+_AGENT_EXECUTOR = ThreadPoolExecutor(max_workers=int(os.getenv("AGENT_POOL", "16")))
+
+def _configure_logging():
+    """Route server logs through a queue so request handlers never block on stderr.
+
+    Level comes from LOG_LEVEL (default WARNING).
+    """
+    if any(isinstance(h, QueueHandler) for h in logger.handlers):
+        return
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, logging.StreamHandler())
+    listener.start()
+    atexit.register(listener.stop)
+    logger.addHandler(QueueHandler(log_queue))
+    logger.setLevel(os.getenv("LOG_LEVEL", "WARNING").upper())
+    logger.propagate = False
+
+def _wants_debug(request: Request) -> bool:
+    """True when the caller asked for the full trace payload (?debug=1 or X-Debug: 1)."""
+    flag = request.query_params.get("debug") or request.headers.get("x-debug") or ""
+    return flag.lower() in ("1", "true", "yes")
+
+# .agent.yaml contents keyed by path → ((mtime_ns, size), text)
+_CONFIG_CACHE: dict = {}
+
+def _read_config(config_path: Path) -> str:
+    """Return the config file's text, re-reading it only when mtime or size change."""
+    st = config_path.stat()
+    signature = (st.st_mtime_ns, st.st_size)
+    cached = _CONFIG_CACHE.get(config_path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    content = config_path.read_text(encoding="utf-8")
+    _CONFIG_CACHE[config_path] = (signature, content)
+    return content
+
+
+# In container mode the config is always copied to /app
+_CONFIG_PATH = Path("/app/.agent.yaml")
+
+# Static service description returned by GET /
+_ROOT_RESPONSE = {
+    "message": "Strands Agent Server (Container Mode)",
+    "version": "1.0.0",
+    "endpoints": {
+        "chat": "POST /chat",
+        "chat_stream": "POST /chat/stream",
+        "health": "GET /health",
+        "info": "GET /info",
+        "config": "GET /config"
+    }
+}
+
+
+def _drop_empty_messages(agent):
+    """Guard: drop any message objects that have an empty content list."""
+    try:
+        if hasattr(agent, 'messages') and isinstance(agent.messages, list):
+            agent.messages = [m for m in agent.messages if m.get('content')]
+    except Exception:
+        # Fail-open: never block the request because of cleanup errors
+        pass
+
+def _sse(data, event: str = None) -> str:
+    """Format one Server-Sent Events frame with a JSON payload."""
+    payload = jsonable_encoder(data)
+    body = orjson.dumps(payload).decode() if orjson is not None else json.dumps(payload)
+    return f"event: {event}\ndata: {body}\n\n" if event else f"data: {body}\n\n"
+
+async def _stream_chat_events(agent, agent_lock: asyncio.Lock, message: str, debug: bool = False):
+    """Yield text deltas as SSE frames, then a final 'done' frame carrying the trace.
+
+    Agents without ``stream_async`` are called in the executor and produce only
+    the final frame.
+    """
+    async with agent_lock:
+        _drop_empty_messages(agent)
+        response = None
+        try:
+            if hasattr(agent, 'stream_async'):
+                async for event in agent.stream_async(message):
+                    if isinstance(event.get("data"), str):
+                        yield _sse({"text": event["data"]})
+                    elif "result" in event:
+                        response = event["result"]
+            else:
+                response = await asyncio.get_running_loop().run_in_executor(_AGENT_EXECUTOR, agent, message)
+            
+            trace_data = extract_strands_trace_data(response, agent=agent, debug=debug) if response is not None else None
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            yield _sse({"detail": str(e)}, event="error")
+            return
+    
+    yield _sse({
+        "response": response.message if hasattr(response, 'message') else str(response),
+        "trace": trace_data
+    }, event="done")
+
 
 def load_agent():
     """Load the agent from the agent.py file."""
@@ -525,18 +731,16 @@ def load_agent():
         print(f"📂 Contents of /app/src: {list(Path('/app/src').iterdir()) if Path('/app/src').exists() else 'Directory not found'}")
         raise ImportError(f"Agent file not found: {agent_path}")
     
-    spec = importlib.util.spec_from_file_location("agent", agent_path)
-    if not spec or not spec.loader:
-        raise ImportError("Could not create module spec for agent")
-    
-    agent_module = importlib.util.module_from_spec(spec)
-    
-    try:
-        spec.loader.exec_module(agent_module)
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        raise ImportError(f"Failed to execute agent module: {e}")
+    # Import through the normal machinery (/app/src is on sys.path) so the
+    # bytecode compiled at image build is reused instead of re-parsing the source
+    agent_module = sys.modules.get("agent")
+    if agent_module is None:
+        try:
+            agent_module = importlib.import_module("agent")
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            raise ImportError(f"Failed to execute agent module: {e}")
     
     agent = getattr(agent_module, "agent", None)
     if not agent:
@@ -551,10 +755,13 @@ def load_agent():
 def create_app():
     """Create a standalone FastAPI app for the agent."""
 
+    _configure_logging()
+    
     app = FastAPI(
         title="Strands Agent Server",
         description="Containerized Strands agent server",
-        version="1.0.0"
+        version="1.0.0",
+        default_response_class=DefaultResponse
     )
     
     # Enable CORS for development
@@ -570,10 +777,14 @@ def create_app():
     # Container mode - load agent and create endpoints
     try:
         agent = load_agent()
+        # Resolve model/name once so per-request trace formatting only does a lookup
+        resolve_agent_meta(agent)
+        # The agent keeps one conversation, so requests take turns on it
+        agent_lock = asyncio.Lock()
         
         # nosem: useless-inner-function
         @app.post("/chat")
-        async def chat_endpoint(request: AgentRequest):
+        async def chat_endpoint(request: AgentRequest, http_request: Request):
             """Chat with the agent."""
             try:
                 message = request.message
@@ -581,25 +792,17 @@ def create_app():
                 if not message:
                     raise HTTPException(status_code=400, detail="Message is required")
                 
-                # Guard: drop any message objects that have an empty content list
-                try:
-                    if hasattr(agent, 'messages') and isinstance(agent.messages, list):
-                        agent.messages = [m for m in agent.messages if m.get('content')]
-                except Exception:
-                    # Fail-open: never block the request because of cleanup errors
-                    pass
-                
-                # Direct agent call
-                response = agent(message)
-                
-                # Extract response content
-                response_text = extract_response_text(response)
+                async with agent_lock:
+                    _drop_empty_messages(agent)
+                    
+                    # Direct agent call
+                    response = await asyncio.get_running_loop().run_in_executor(_AGENT_EXECUTOR, agent, message)
                 
                 # Extract trace data
                 if hasattr(response, '_is_temporary_agent') and response._is_temporary_agent:
-                    trace_data = extract_direct_metrics_from_response(response)
+                    trace_data = extract_direct_metrics_from_response(response, debug=_wants_debug(http_request))
                 else:
-                    trace_data = extract_strands_trace_data(response, agent=agent)
+                    trace_data = extract_strands_trace_data(response, agent=agent, debug=_wants_debug(http_request))
                 
                 return {
                     "response": response.message if hasattr(response, 'message') else str(response),
@@ -609,6 +812,17 @@ def create_app():
                 import traceback
                 traceback.print_exc()
                 raise HTTPException(status_code=500, detail=str(e))
+        
+        # nosem: useless-inner-function
+        @app.post("/chat/stream")
+        async def chat_stream_endpoint(request: AgentRequest, http_request: Request):
+            """Chat with the agent, streaming the reply as Server-Sent Events."""
+            if not request.message:
+                raise HTTPException(status_code=400, detail="Message is required")
+            return StreamingResponse(
+                _stream_chat_events(agent, agent_lock, request.message, _wants_debug(http_request)),
+                media_type="text/event-stream"
+            )
                 
     except Exception as e:
         print(f"❌ Failed to load agent: {e}")
@@ -661,43 +875,10 @@ def create_app():
                 "status": "error"
             }
         
-        agent_name = "Agent"
-        if hasattr(agent, 'name'):
-            agent_name = agent.name
-        elif hasattr(agent, '__class__'):
-            agent_name = agent.__class__.__name__
+        meta = resolve_agent_meta(agent)
+        agent_name = meta['name']
+        model_info = meta['model'] or "unknown"
         
-        # Extract model info properly with error handling
-        model_info = "unknown"
-        if hasattr(agent, 'model') and agent.model:
-            model_obj = agent.model
-            try:
-                if hasattr(model_obj, 'model_id'):
-                    model_info = str(model_obj.model_id)
-                elif hasattr(model_obj, 'model'):
-                    model_info = str(model_obj.model)
-                elif hasattr(model_obj, 'model_name'):
-                    model_info = str(model_obj.model_name)
-                elif hasattr(model_obj, '_model_id'):
-                    model_info = str(model_obj._model_id)
-                elif hasattr(model_obj, '__dict__') and 'model_id' in model_obj.__dict__:
-                    model_info = str(model_obj.__dict__['model_id'])
-                else:
-                    try:
-                        class_name = model_obj.__class__.__name__
-                        if 'Bedrock' in class_name:
-                            model_info = "BedrockModel"
-                        elif 'Anthropic' in class_name:
-                            model_info = "AnthropicModel"
-                        elif 'OpenAI' in class_name:
-                            model_info = "OpenAIModel"
-                        else:
-                            model_info = class_name
-                    except (AttributeError, TypeError):
-                        model_info = "Unknown Model"
-            except (AttributeError, TypeError, ValueError):
-                model_info = "Unknown Model"
-                    
         return {
             "name": agent_name,
             "description": "Containerized Strands agent",
@@ -710,38 +891,20 @@ def create_app():
     async def agent_config():
         """Get the agent configuration from .agent.yaml."""
         try:
-            # In container mode, look for .agent.yaml in /app
-            config_path = Path("/app/.agent.yaml")
-            
-            if not config_path.exists():
-                raise HTTPException(status_code=404, detail="Agent configuration file (.agent.yaml) not found")
-            
-            # Read and return the YAML content as text
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config_content = f.read()
-            
+            # Return the YAML content as text (a missing file surfaces from stat)
             return {
-                "config_path": str(config_path),
-                "content": config_content
+                "config_path": str(_CONFIG_PATH),
+                "content": _read_config(_CONFIG_PATH)
             }
         except FileNotFoundError:
-            raise HTTPException(status_code=404, detail="Agent configuration file not found")
+            raise HTTPException(status_code=404, detail="Agent configuration file (.agent.yaml) not found")
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error reading configuration: {str(e)}")
     
     # nosem: useless-inner-function
     @app.get("/")
     async def root():
-        return {
-            "message": "Strands Agent Server (Container Mode)",
-            "version": "1.0.0",
-            "endpoints": {
-                "chat": "POST /chat",
-                "health": "GET /health", 
-                "info": "GET /info",
-                "config": "GET /config"
-            }
-        }
+        return _ROOT_RESPONSE
     
     return app
     
@@ -755,6 +918,9 @@ def main():
     
     print(f"🐳 Starting Strands Agent Server on {host}:{port}")
     
+    # Single process on purpose: the agent keeps conversation history in memory,
+    # so extra workers would each hold a separate, diverging conversation.
+    # uvicorn's default loop/http "auto" picks uvloop and httptools, which the image installs
     try:
         app = create_app()
         print(f"✅ App created successfully")
@@ -1,25 +1,31 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 
+def _block_text(item) -> str:
+    """Return the text of one content block."""
+    if isinstance(item, dict) and 'text' in item:
+        return item['text']
+    elif hasattr(item, 'text'):
+        return item.text
+    elif isinstance(item, str):
+        return item
+    else:
+        return str(item)
+
 def extract_response_text(response) -> str:
     """Extract text content from various response formats."""
+    if isinstance(response, str):
+        return response
     if hasattr(response, 'message'):
         return str(response.message)
     elif hasattr(response, 'content'):
         if isinstance(response.content, list):
-            # Handle list of content blocks (e.g., [{"text": "..."}])
-            text_parts = []
-            for item in response.content:
-                if isinstance(item, dict) and 'text' in item:
-                    text_parts.append(item['text'])
-                elif hasattr(item, 'text'):
-                    text_parts.append(item.text)
-                else:
-                    text_parts.append(str(item))
-            return ' '.join(text_parts)
+            # Handle list of content blocks (e.g., [{"text": "..."}]); join() materializes
+            # its argument anyway, so a list comprehension is the cheapest feed
+            return ' '.join([_block_text(item) for item in response.content])
         else:
             return str(response.content)
     elif hasattr(response, 'text'):
         return str(response.text)
     else:
-        return str(response) 
\ No newline at end of file
+        return str(response)
@@ -2,8 +2,50 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import os
+from functools import lru_cache
 from pathlib import Path
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+
+from agentcli import __version__
+
+
+class _BytecodeCache(FileSystemBytecodeCache):
+    """Bytecode cache that creates its directory on the first store.
+
+    Loading from a missing directory is already a cache miss in Jinja; an
+    unwritable directory just means the compiled template is not persisted.
+    """
+
+    def dump_bytecode(self, bucket):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            super().dump_bytecode(bucket)
+        except OSError:
+            pass
+
+
+def _bytecode_cache():
+    """Return a per-version on-disk cache for compiled templates.
+
+    Jinja compiles agent_server.py.j2 to Python on first use; persisting that
+    lets later CLI invocations skip the parse/compile step. Nothing is
+    created on disk until a template is first compiled.
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return _BytecodeCache(os.path.join(base, "agentcli", __version__, "templates"))
+
+
+@lru_cache(maxsize=16)
+def _read_utility_file(filename: str) -> str:
+    """Read a utility file next to this module and return its content.
+
+    Cached per filename so every generator instance shares one read.
+    """
+    file_path = Path(__file__).parent / filename
+    try:
+        return file_path.read_text(encoding='utf-8')
+    except FileNotFoundError:
+        return f"# {filename} not found"
 
 
 class ServerTemplateGenerator:
@@ -12,61 +54,71 @@ class ServerTemplateGenerator:
     def __init__(self):
         self.core_dir = Path(__file__).parent
         self.template_dir = self.core_dir
-        # Enable autoescaping for HTML/XML templates to mitigate XSS risks (Bandit B701).
-        # Code templates (e.g., .py.j2) are not auto-escaped to avoid corrupting generated code.
-        # nosem: direct-use-of-jinja2 - Used for Python code generation, not HTML/user output
-        self.env = Environment(
-            loader=FileSystemLoader(str(self.template_dir)),
-            autoescape=select_autoescape(enabled_extensions=("html", "xml"), default_for_string=False)
-        )
+        # Environment and master template are built on first use so that
+        # importing this module (and its global instance) stays off the filesystem
+        self._env = None
+        self._template = None
+        # Rendered server code per mode; output depends only on the template and utilities
+        self._rendered: dict[str, str] = {}
     
-    def _read_utility_file(self, filename: str) -> str:
-        """Read a utility file and return its content."""
-        file_path = self.core_dir / filename
-        if file_path.exists():
-            with open(file_path, 'r') as f:
-                return f.read()
-        return f"# {filename} not found"
+    @property
+    def env(self) -> Environment:
+        """Jinja environment for the master template, created on first access."""
+        if self._env is None:
+            # Enable autoescaping for HTML/XML templates to mitigate XSS risks (Bandit B701).
+            # Code templates (e.g., .py.j2) are not auto-escaped to avoid corrupting generated code.
+            # nosem: direct-use-of-jinja2 - Used for Python code generation, not HTML/user output
+            self._env = Environment(
+                loader=FileSystemLoader(str(self.template_dir)),
+                autoescape=select_autoescape(enabled_extensions=("html", "xml"), default_for_string=False),
+                bytecode_cache=_bytecode_cache(),
+                # Packaged templates never change while the CLI runs; skip uptodate stats
+                auto_reload=False
+            )
+        return self._env
+    
+    def _context(self, mode: str) -> dict:
+        """Load the master template once and return its render variables for ``mode``."""
+        if self._template is None:
+            self._template = self.env.get_template('agent_server.py.j2')
+        return {
+            "mode": mode,
+            "response_utils": _read_utility_file('response_utils.py'),
+            "trace_utils": _read_utility_file('trace_utils.py'),
+        }
+    
+    def _render(self, mode: str) -> str:
+        """Render the master template for ``mode``, reusing an earlier render."""
+        code = self._rendered.get(mode)
+        if code is None:
+            context = self._context(mode)
+            code = self._rendered[mode] = self._template.render(**context)  # nosem: direct-use-of-jinja2
+        return code
     
     def generate_local_server(self) -> str:
         """Generate local development server code."""
-        template = self.env.get_template('agent_server.py.j2')
-        
-        # Read utility files
-        response_utils = self._read_utility_file('response_utils.py')
-        trace_utils = self._read_utility_file('trace_utils.py')
-        
-        return template.render(  # nosem: direct-use-of-jinja2
-            mode="local",
-            response_utils=response_utils,
-            trace_utils=trace_utils
-        )
+        return self._render("local")
     
     def generate_container_server(self) -> str:
         """Generate container server code."""
-        template = self.env.get_template('agent_server.py.j2')
-        
-        # Read utility files
-        response_utils = self._read_utility_file('response_utils.py')
-        trace_utils = self._read_utility_file('trace_utils.py')
-        
-        return template.render(  # nosem: direct-use-of-jinja2
-            mode="container",
-            response_utils=response_utils,
-            trace_utils=trace_utils
-        )
+        return self._render("container")
+    
+    def _write(self, mode: str, output_path: Path):
+        """Write server code for ``mode``, streaming the render unless it is already cached."""
+        code = self._rendered.get(mode)
+        if code is not None:
+            Path(output_path).write_text(code, encoding='utf-8')
+            return
+        context = self._context(mode)
+        self._template.stream(**context).dump(str(output_path), encoding='utf-8')  # nosem: direct-use-of-jinja2
     
     def write_local_server(self, output_path: Path):
         """Write local server code to file."""
-        code = self.generate_local_server()
-        with open(output_path, 'w') as f:
-            f.write(code)
+        self._write("local", output_path)
     
     def write_container_server(self, output_path: Path):
         """Write container server code to file."""
-        code = self.generate_container_server()
-        with open(output_path, 'w') as f:
-            f.write(code)
+        self._write("container", output_path)
 
 
 # Global instance
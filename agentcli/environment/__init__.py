@@ -3,14 +3,44 @@
 
 """Environment and credential management for ADT"""
 
+from __future__ import annotations
+
 import os
-import boto3
+import re
 import yaml
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Optional, List, Tuple
+from typing import TYPE_CHECKING, Dict, Optional, List, Set, Tuple
 from dataclasses import dataclass
 import typer
 
+if TYPE_CHECKING:
+    import boto3
+
+# libyaml's C parser is much faster than the pure-Python one; fall back when PyYAML lacks it
+try:
+    from yaml import CSafeLoader as _BaseLoader
+except ImportError:
+    from yaml import SafeLoader as _BaseLoader
+
+# Non-blank, non-comment lines of a .env file, surrounding whitespace excluded
+_ENV_LINE = re.compile(r'^[ \t]*([^#\s].*?)[ \t]*$', re.M)
+
+class StrictLoader(_BaseLoader):
+    """Safe YAML loader that rejects duplicate mapping keys."""
+    
+    def construct_mapping(self, node, deep=False):
+        mapping = {}
+        for key_node, value_node in node.value:
+            key = self.construct_object(key_node, deep=deep)
+            if key in mapping:
+                raise yaml.constructor.ConstructorError(
+                    f"Duplicate key '{key}' found in YAML", key_node.start_mark
+                )
+            value = self.construct_object(value_node, deep=deep)
+            mapping[key] = value
+        return mapping
+
 @dataclass
 class AWSCredentials:
     """AWS credential information."""
@@ -24,38 +54,40 @@ class AWSCredentials:
 class EnvironmentManager:
     """Manages environment variables and AWS credentials."""
     
+    aws_env_vars = frozenset({
+        'AWS_ACCESS_KEY_ID',
+        'AWS_SECRET_ACCESS_KEY',
+        'AWS_SESSION_TOKEN',
+        'AWS_REGION',
+        'AWS_PROFILE'
+    })
+    
     def __init__(self):
-        self.aws_env_vars = [
-            'AWS_ACCESS_KEY_ID',
-            'AWS_SECRET_ACCESS_KEY', 
-            'AWS_SESSION_TOKEN',
-            'AWS_REGION',
-            'AWS_PROFILE'
-        ]
+        # Parsed providers per config path: path -> ((mtime_ns, size), providers)
+        self._provider_cache: Dict[Path, Tuple[Tuple[int, int], List[str]]] = {}
+        # boto3 sessions per profile (None = default chain) and STS clients per credential set;
+        # building either loads botocore models, so reuse them for this manager's lifetime
+        self._session_cache: Dict[Optional[str], boto3.Session] = {}
+        self._sts_client_cache: Dict[Tuple[str, str, Optional[str], Optional[str]], object] = {}
+        # Credential sets that already passed sts:GetCallerIdentity
+        self._validated_creds: Set[Tuple[str, str, Optional[str]]] = set()
     
     def get_configured_providers(self, project_dir: Path) -> List[str]:
         """Get all configured (uncommented) providers from agent config."""
         config_file = project_dir / ".agent.yaml"
-        if not config_file.exists():
+        try:
+            stat = config_file.stat()
+        except OSError:
             return []
         
+        # Several checks per command read the same file; reparse only when it changes
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._provider_cache.get(config_file)
+        if cached is not None and cached[0] == signature:
+            return list(cached[1])
+        
         try:
-            with open(config_file) as f:
-                content = f.read()
-            
-            # Custom YAML loader that detects duplicate keys
-            class StrictLoader(yaml.SafeLoader):
-                def construct_mapping(self, node, deep=False):
-                    mapping = {}
-                    for key_node, value_node in node.value:
-                        key = self.construct_object(key_node, deep=deep)
-                        if key in mapping:
-                            raise yaml.constructor.ConstructorError(
-                                f"Duplicate key '{key}' found in YAML", key_node.start_mark
-                            )
-                        value = self.construct_object(value_node, deep=deep)
-                        mapping[key] = value
-                    return mapping
+            content = config_file.read_text(encoding='utf-8')
             
             # Parse the YAML with duplicate key detection
             config = yaml.load(content, Loader=StrictLoader)
@@ -64,10 +96,12 @@ class EnvironmentManager:
             provider_section = config.get("provider", {})
             
             # Check if there's a single provider.class defined
+            providers = []
             if isinstance(provider_section, dict) and "class" in provider_section:
-                return [provider_section["class"]]
+                providers = [provider_section["class"]]
             
-            return []
+            self._provider_cache[config_file] = (signature, providers)
+            return list(providers)
             
         except yaml.constructor.ConstructorError as e:
             if "Duplicate key" in str(e):
@@ -121,15 +155,16 @@ class EnvironmentManager:
             raise typer.Exit(1)
         
         try:
-            with open(env_file_path) as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        if '=' in line:
-                            key, value = line.split('=', 1)
-                            env_vars[key.strip()] = value.strip()
-                        else:
-                            typer.echo(f"Warning: Invalid line {line_num} in {env_file_path}: {line}", err=True)
+            text = env_file_path.read_text(encoding='utf-8')
+            # The regex skips blank and comment lines in C; only KEY=VALUE lines reach Python
+            for match in _ENV_LINE.finditer(text):
+                line = match.group(1)
+                key, sep, value = line.partition('=')
+                if sep:
+                    env_vars[key.strip()] = value.strip()
+                else:
+                    line_num = text.count('\n', 0, match.start()) + 1
+                    typer.echo(f"Warning: Invalid line {line_num} in {env_file_path}: {line}", err=True)
             
             return env_vars
             
@@ -207,7 +242,7 @@ class EnvironmentManager:
     def _get_credentials_from_profile(self, profile: str) -> AWSCredentials:
         """Get credentials from AWS profile."""
         try:
-            session = boto3.Session(profile_name=profile)
+            session = self._get_session(profile)
             credentials = session.get_credentials()
             
             if credentials:
@@ -233,7 +268,7 @@ class EnvironmentManager:
     def _get_credentials_from_boto3(self) -> AWSCredentials:
         """Get credentials from boto3 default chain."""
         try:
-            session = boto3.Session()
+            session = self._get_session()
             credentials = session.get_credentials()
             
             if credentials:
@@ -254,17 +289,16 @@ class EnvironmentManager:
         if not credentials.access_key_id or not credentials.secret_access_key:
             return False
         
+        # The STS round-trip dominates this check; do it once per credential set
+        key = (credentials.access_key_id, credentials.secret_access_key, credentials.session_token)
+        if key in self._validated_creds:
+            return True
+        
         try:
-            session = boto3.Session(
-                aws_access_key_id=credentials.access_key_id,
-                aws_secret_access_key=credentials.secret_access_key,
-                aws_session_token=credentials.session_token,
-                region_name=credentials.region
-            )
-            
             # Try to get caller identity
-            sts = session.client('sts')
+            sts = self._get_sts_client(credentials)
             sts.get_caller_identity()
+            self._validated_creds.add(key)
             return True
             
         except Exception as e:
@@ -287,8 +321,7 @@ class EnvironmentManager:
             env_vars.update(file_vars)
             
             # Apply to current environment
-            for key, value in file_vars.items():
-                os.environ[key] = value
+            os.environ.update(file_vars)
         
         # Validate provider configuration and check if Bedrock is configured
         needs_aws = True
@@ -354,51 +387,72 @@ class EnvironmentManager:
         aws_profile: Optional[str] = None
     ) -> List[str]:
         """Get Docker environment arguments for container runs."""
-        args = []
-        
-        # Add env file if provided
-        if env_file and env_file.exists():
-            env_vars = self.load_env_file(env_file)
-            for key, value in env_vars.items():
-                args.extend(["--env", f"{key}={value}"])
+        # Add env file if provided (read once; also feeds the AWS credential lookup)
+        env_file_vars = self.load_env_file(env_file) if env_file and env_file.exists() else {}
+        assignments = [f"{key}={value}" for key, value in env_file_vars.items()]
         
         # Add AWS credentials
-        # Load env file vars if provided for Docker
-        env_file_vars = {}
-        if env_file and env_file.exists():
-            env_file_vars = self.load_env_file(env_file)
         aws_creds = self.get_aws_credentials(aws_profile, env_file_vars)
         if aws_creds.access_key_id:
-            args.extend(["--env", f"AWS_ACCESS_KEY_ID={aws_creds.access_key_id}"])
-            args.extend(["--env", f"AWS_SECRET_ACCESS_KEY={aws_creds.secret_access_key}"])
+            assignments.append(f"AWS_ACCESS_KEY_ID={aws_creds.access_key_id}")
+            assignments.append(f"AWS_SECRET_ACCESS_KEY={aws_creds.secret_access_key}")
             
             if aws_creds.session_token:
-                args.extend(["--env", f"AWS_SESSION_TOKEN={aws_creds.session_token}"])
+                assignments.append(f"AWS_SESSION_TOKEN={aws_creds.session_token}")
             
             if aws_creds.region:
-                args.extend(["--env", f"AWS_REGION={aws_creds.region}"])
+                assignments.append(f"AWS_REGION={aws_creds.region}")
         
-        return args
+        # Interleave the flags in one pass instead of extending with a temporary list per variable
+        return [part for assignment in assignments for part in ("--env", assignment)]
 
     # ----------------------------------------
     # Helper functions
     # ----------------------------------------
 
+    def _get_session(self, profile: Optional[str] = None) -> boto3.Session:
+        """Return a cached boto3 session for ``profile`` (None uses the default chain)."""
+        session = self._session_cache.get(profile)
+        if session is None:
+            # botocore loads its service models on import; only pay that on the AWS path
+            import boto3
+            session = self._session_cache[profile] = boto3.Session(profile_name=profile)
+        return session
+
+    def _get_sts_client(self, credentials: AWSCredentials):
+        """Return a cached STS client built from explicit credentials."""
+        key = (credentials.access_key_id, credentials.secret_access_key,
+               credentials.session_token, credentials.region)
+        sts = self._sts_client_cache.get(key)
+        if sts is None:
+            import boto3
+            session = boto3.Session(
+                aws_access_key_id=credentials.access_key_id,
+                aws_secret_access_key=credentials.secret_access_key,
+                aws_session_token=credentials.session_token,
+                region_name=credentials.region
+            )
+            sts = self._sts_client_cache[key] = session.client('sts')
+        return sts
+
     def _clear_aws_env_vars(self):
         """Remove AWS credential-related variables from current environment."""
-        for var in self.aws_env_vars:
-            if var in os.environ:
-                os.environ.pop(var, None)
+        for var in self.aws_env_vars.intersection(os.environ):
+            os.environ.pop(var, None)
 
     def _export_creds_to_env(self, creds: 'AWSCredentials'):
         """Export provided credentials to environment variables for child processes."""
-        os.environ['AWS_ACCESS_KEY_ID'] = creds.access_key_id or ''
-        os.environ['AWS_SECRET_ACCESS_KEY'] = creds.secret_access_key or ''
+        updates = {
+            'AWS_ACCESS_KEY_ID': creds.access_key_id or '',
+            'AWS_SECRET_ACCESS_KEY': creds.secret_access_key or ''
+        }
         if creds.session_token:
-            os.environ['AWS_SESSION_TOKEN'] = creds.session_token
+            updates['AWS_SESSION_TOKEN'] = creds.session_token
         if creds.region:
-            os.environ['AWS_REGION'] = creds.region
+            updates['AWS_REGION'] = creds.region
+        os.environ.update(updates)
 
+@lru_cache(maxsize=1)
 def create_environment_manager() -> EnvironmentManager:
-    """Create and return an environment manager instance."""
+    """Return the process-wide environment manager, so its caches outlive one call."""
     return EnvironmentManager() 
\ No newline at end of file
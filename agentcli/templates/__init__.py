@@ -31,6 +31,7 @@ class ProjectConfig:
     pydantic_version: str = "2.0.0"
     fastapi_version: str = "0.68.0"
     uvicorn_version: str = "0.15.0"
+    orjson_version: str = "3.9.0"
     multipart_version: str = "0.0.5"
     dotenv_version: str = "1.0.0"
     
@@ -47,14 +48,22 @@ class TemplateEngine:
     """Jinja2-based template engine for project generation."""
     
     def __init__(self):
+        # Shares the per-version on-disk cache of compiled templates with the server generator
+        from ..core.template_generator import _bytecode_cache
+        
         self.template_dir = Path(__file__).parent
         # nosem: direct-use-of-jinja2 - Used for Python code generation, not HTML/user output
         self.env = jinja2.Environment(
             loader=jinja2.FileSystemLoader(str(self.template_dir)),
             autoescape=jinja2.select_autoescape(['html', 'xml']),
             trim_blocks=True,
-            lstrip_blocks=True
+            lstrip_blocks=True,
+            bytecode_cache=_bytecode_cache(),
+            # Templates ship with the package and never change while the CLI runs
+            auto_reload=False
         )
+        # Loaded templates by name; skips the loader lookup when one is rendered again
+        self._template_cache: Dict[str, jinja2.Template] = {}
     
     def render_template(self, template_name: str, config: ProjectConfig) -> str:
         """Render a template with the given configuration."""
@@ -63,7 +72,9 @@ class TemplateEngine:
             from ..core.template_generator import template_generator
             return template_generator.generate_container_server()
         
-        template = self.env.get_template(template_name)
+        template = self._template_cache.get(template_name)
+        if template is None:
+            template = self._template_cache[template_name] = self.env.get_template(template_name)
         return template.render(**config.__dict__)  # nosem: direct-use-of-jinja2
     
     def get_template_mapping(self) -> Dict[str, str]:
@@ -160,7 +160,8 @@ export default function ChatInterface() {
     setIsLoading(true)
 
     try {
-      const response = await fetch('/chat', {
+      // debug=1 keeps the raw traces and metrics summary the metrics panel renders
+      const response = await fetch('/chat?debug=1', {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -9,10 +9,18 @@ import subprocess
 import shutil
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 
 logger = logging.getLogger(__name__)
 
+def _link_or_copy(src: str, dst: str) -> str:
+    """copytree copy_function that hard-links files, falling back to a real copy."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+    return dst
+
 class UIBuilder:
     """Builds and manages the embedded UI project."""
     
@@ -20,34 +28,40 @@ class UIBuilder:
         self.ui_dir = Path(__file__).parent / "ui"
         self.build_dir = self.ui_dir / "out"
         self.static_dir = Path(__file__).parent / "static"
+        # Result of the last is_built() probe; cleared whenever the static directory is rewritten
+        self._is_built_cache: Optional[bool] = None
+        # node/npm availability by executable name, probed at most once
+        self._tool_checks: Dict[str, bool] = {}
         
+    def _check_tool(self, tool: str, label: str) -> bool:
+        """Run ``tool --version`` once per builder and remember whether it worked."""
+        installed = self._tool_checks.get(tool)
+        if installed is None:
+            installed = False
+            # Resolve on PATH first so a missing tool costs no process spawn
+            tool_path = shutil.which(tool)
+            if tool_path:
+                try:
+                    result = subprocess.run(
+                        [tool_path, "--version"], 
+                        capture_output=True, 
+                        text=True, 
+                        check=True
+                    )
+                    logger.info(f"{label} version: {result.stdout.strip()}")
+                    installed = True
+                except (subprocess.CalledProcessError, OSError):
+                    pass
+            self._tool_checks[tool] = installed
+        return installed
+    
     def check_node_installed(self) -> bool:
         """Check if Node.js is installed."""
-        try:
-            result = subprocess.run(
-                ["node", "--version"], 
-                capture_output=True, 
-                text=True, 
-                check=True
-            )
-            logger.info(f"Node.js version: {result.stdout.strip()}")
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
+        return self._check_tool("node", "Node.js")
     
     def check_npm_installed(self) -> bool:
         """Check if npm is installed."""
-        try:
-            result = subprocess.run(
-                ["npm", "--version"], 
-                capture_output=True, 
-                text=True, 
-                check=True
-            )
-            logger.info(f"npm version: {result.stdout.strip()}")
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
+        return self._check_tool("npm", "npm")
     
     def install_dependencies(self) -> bool:
         """Install npm dependencies."""
@@ -55,17 +69,37 @@ class UIBuilder:
             logger.error(f"UI directory not found: {self.ui_dir}")
             return False
             
+        # Skip the audit/funding registry round-trips and reuse the npm cache where it is fresh;
+        # only stderr is kept, for the error report
+        npm_flags = ["--prefer-offline", "--no-audit", "--no-fund"]
+        package_lock = self.ui_dir / "package-lock.json"
+        
+        # The shipped lockfile already pins the dependency tree; npm ci installs it without re-resolving
+        if package_lock.exists():
+            try:
+                subprocess.run(
+                    ["npm", "ci", *npm_flags],
+                    cwd=self.ui_dir,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    check=True
+                )
+                return True
+            except subprocess.CalledProcessError as e:
+                logger.info(f"npm ci failed, falling back to a fresh install: {e.stderr}")
+            
         try:
             # Remove package-lock.json to avoid path issues in packaged environment
-            package_lock = self.ui_dir / "package-lock.json"
             if package_lock.exists():
                 logger.info("Removing package-lock.json for fresh install...")
                 package_lock.unlink()
                 
-            result = subprocess.run(
-                ["npm", "install"],
+            subprocess.run(
+                ["npm", "install", *npm_flags],
                 cwd=self.ui_dir,
-                capture_output=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
                 text=True,
                 check=True
             )
@@ -99,13 +133,17 @@ class UIBuilder:
             logger.error(f"Build directory not found: {self.build_dir}")
             return False
             
+        # The static directory is about to change; re-probe on the next is_built()
+        self._is_built_cache = None
         try:
             # Remove existing static directory
             if self.static_dir.exists():
                 shutil.rmtree(self.static_dir)
             
-            # Copy build output to static directory
-            shutil.copytree(self.build_dir, self.static_dir)
+            # Hard-link the build output into the static directory; Next.js rewrites out/
+            # from scratch on each build, so links never see later edits. Copy when linking
+            # is unsupported (e.g. across filesystems)
+            shutil.copytree(self.build_dir, self.static_dir, copy_function=_link_or_copy)
             return True
         except Exception as e:
             logger.error(f"Failed to copy build assets: {e}")
@@ -139,10 +177,13 @@ class UIBuilder:
     
     def is_built(self) -> bool:
         """Check if UI is already built."""
-        return (
-            self.static_dir.exists() and 
-            (self.static_dir / "index.html").exists()
-        )
+        # The dev server asks on every page load; the answer only changes when assets are copied
+        if self._is_built_cache is None:
+            self._is_built_cache = (
+                self.static_dir.exists() and 
+                (self.static_dir / "index.html").exists()
+            )
+        return self._is_built_cache
     
     def get_static_dir(self) -> Optional[Path]:
         """Get the static directory path if UI is built."""